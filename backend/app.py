@@ -1,25 +1,51 @@
 import os
 
-from flask import Flask
+from flask import Flask, request
 from flask_cors import CORS
 from routes.states import states_bp
 from routes.policies import policies_bp
 from routes.trends import trends_bp
 from routes.ask import ask_bp
-from models.database import get_db
+from routes.documents import documents_bp
+from routes.export import export_bp
+from models.database import get_db, pool_stats, release_db
+from services.answer_cache import cache_stats
+import metrics
 
 app = Flask(__name__)
 
 is_dev = os.environ.get('FLASK_ENV') == 'development'
-if is_dev:
-    CORS(app)
-else:
-    CORS(app, origins=['https://asiagenawi.github.io'])
+CORS_ORIGINS = '*' if is_dev else ['https://asiagenawi.github.io']
+CORS(app, origins=CORS_ORIGINS)
 
 app.register_blueprint(states_bp)
 app.register_blueprint(policies_bp)
 app.register_blueprint(trends_bp)
 app.register_blueprint(ask_bp)
+app.register_blueprint(documents_bp)
+app.register_blueprint(export_bp)
+app.teardown_appcontext(release_db)
+
+
+@app.before_request
+def start_request_metrics():
+    request.environ['statescope.metrics'] = metrics.begin_request()
+
+
+@app.after_request
+def record_request_metrics(response):
+    token = request.environ.pop('statescope.metrics', None)
+    if token is None:
+        return response
+    timings = metrics.end_request(token)
+    route = request.url_rule.rule if request.url_rule else 'unmatched'
+    metrics.observe('statescope_http_request_duration_seconds', timings['total'],
+                    method=request.method, route=route, status=str(response.status_code))
+    metrics.observe('statescope_sql_duration_seconds', timings['db'], route=route)
+    metrics.inc('statescope_sql_statements_total', timings['sql_statements'], route=route)
+    response.headers['Server-Timing'] = metrics.server_timing(timings)
+    metrics.flush()
+    return response
 
 
 @app.route('/api/health')
@@ -27,7 +53,17 @@ def health():
     db = get_db()
     count = db.execute('SELECT COUNT(*) FROM policies').fetchone()[0]
     db.close()
-    return {'status': 'ok', 'policy_count': count}
+    return {
+        'status': 'ok',
+        'policy_count': count,
+        'db_pool': pool_stats(),
+        'answer_cache': cache_stats(),
+    }
+
+
+@app.route('/api/metrics')
+def prometheus_metrics():
+    return metrics.render_prometheus(), 200, {'Content-Type': 'text/plain; version=0.0.4'}
 
 
 if __name__ == '__main__':
@@ -0,0 +1,182 @@
+"""ASGI entry point: the Flask app plus natively async /api/ask.
+
+Run with:
+    python -m uvicorn --app-dir backend asgi:app
+
+Under sync gunicorn workers every /api/ask request holds a worker for the
+whole Claude call, so a few questions can leave cheap read requests
+queued behind them. Here POST /api/ask and /api/ask/stream are served on
+the event loop (services/ask_service.py async variants, with their own
+Claude concurrency budget) while every other request runs through the
+unchanged Flask app on a2wsgi's pool of ASGI_WSGI_THREADS threads.
+"""
+
+import asyncio
+
+from a2wsgi import WSGIMiddleware
+from werkzeug.datastructures import MIMEAccept
+from werkzeug.http import parse_accept_header
+
+import config
+import metrics
+from app import CORS_ORIGINS, app as flask_app
+from services import ask_service
+from services.rate_limiter import check_rate_limit
+
+ASK_ROUTES = {'/api/ask', '/api/ask/stream'}
+MAX_BODY = 64 * 1024
+
+wsgi_app = WSGIMiddleware(flask_app, workers=config.ASGI_WSGI_THREADS)
+
+
+def _header(scope, name):
+    for key, value in scope['headers']:
+        if key == name:
+            return value.decode('latin-1')
+    return ''
+
+
+def _cors_headers(scope):
+    """The headers Flask-CORS would add for this request's Origin."""
+    if CORS_ORIGINS == '*':
+        return [(b'access-control-allow-origin', b'*')]
+    origin = _header(scope, b'origin')
+    if origin in CORS_ORIGINS:
+        return [(b'access-control-allow-origin', origin.encode('latin-1')), (b'vary', b'Origin')]
+    return []
+
+
+async def _read_body(receive):
+    """The request body, or None if it is too large or the client went away."""
+    body = b''
+    while True:
+        message = await receive()
+        if message['type'] == 'http.disconnect':
+            return None
+        body += message.get('body', b'')
+        if len(body) > MAX_BODY:
+            return None
+        if not message.get('more_body'):
+            return body
+
+
+async def _read_question(scope, receive):
+    """Apply the rate limit and validate the body (as routes/ask.py does).
+    Returns (question, None) or (None, (status, body, headers))."""
+    client = scope.get('client') or (None,)
+    allowed, retry_after = await ask_service.run_db(check_rate_limit, client[0])
+    if not allowed:
+        return None, (429, {'error': f'Rate limit exceeded. Please retry in {retry_after} seconds.'},
+                      [(b'retry-after', str(retry_after).encode())])
+
+    body = await _read_body(receive)
+    if body is None:
+        return None, (413, {'error': 'Request body too large'}, [])
+    try:
+        data = flask_app.json.loads(body)
+    except ValueError:
+        data = None
+    if not isinstance(data, dict):
+        return None, (400, {'error': 'Request body must be a JSON object'}, [])
+    question = (data.get('question') or '').strip()
+    if not question:
+        return None, (400, {'error': 'Question is required'}, [])
+    return question, None
+
+
+def _finish(token, route, status):
+    """Record the request metrics app.py records for Flask routes."""
+    timings = metrics.end_request(token)
+    metrics.observe('statescope_http_request_duration_seconds', timings['total'],
+                    method='POST', route=route, status=str(status))
+    metrics.observe('statescope_sql_duration_seconds', timings['db'], route=route)
+    metrics.inc('statescope_sql_statements_total', timings['sql_statements'], route=route)
+    metrics.flush()
+    return timings
+
+
+async def _send_json(send, status, body, headers):
+    payload = flask_app.json.dumps(body).encode() + b'\n'
+    await send({'type': 'http.response.start', 'status': status, 'headers': [
+        (b'content-type', b'application/json'),
+        (b'content-length', str(len(payload)).encode()),
+        *headers,
+    ]})
+    await send({'type': 'http.response.body', 'body': payload})
+
+
+async def _send_stream(send, receive, question, headers):
+    """Stream the answer as Server-Sent Events, abandoning the Claude call
+    (and freeing its slot) as soon as the client disconnects."""
+    await send({'type': 'http.response.start', 'status': 200, 'headers': [
+        (b'content-type', b'text/event-stream; charset=utf-8'),
+        (b'cache-control', b'no-cache'),
+        (b'x-accel-buffering', b'no'),
+        *headers,
+    ]})
+
+    async def pump():
+        async for frame in ask_service.stream_answer_async(question):
+            await send({'type': 'http.response.body', 'body': frame.encode(), 'more_body': True})
+        await send({'type': 'http.response.body', 'body': b''})
+
+    async def disconnected():
+        while (await receive())['type'] != 'http.disconnect':
+            pass
+
+    tasks = [asyncio.ensure_future(pump()), asyncio.ensure_future(disconnected())]
+    done, pending = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+    for task in pending:
+        task.cancel()
+    await asyncio.gather(*pending, return_exceptions=True)
+    for task in done:
+        task.result()
+
+
+async def ask(scope, receive, send):
+    token = metrics.begin_request()
+    route = scope['path']
+    cors = _cors_headers(scope)
+    question, error = await _read_question(scope, receive)
+
+    if error is None and (route == '/api/ask/stream' or
+                          parse_accept_header(_header(scope, b'accept'), MIMEAccept).best == 'text/event-stream'):
+        try:
+            await _send_stream(send, receive, question, cors)
+        finally:
+            _finish(token, route, 200)
+        return
+
+    if error is not None:
+        status, body, headers = error
+    else:
+        try:
+            status, body, headers = 200, await ask_service.answer_async(question), []
+        except ask_service.AskBusy as e:
+            status, body, headers = 503, {'error': str(e)}, [(b'retry-after', str(e.retry_after).encode())]
+        except Exception as e:
+            status, body, headers = 500, {'error': str(e)}, []
+    timings = _finish(token, route, status)
+    headers.append((b'server-timing', metrics.server_timing(timings).encode()))
+    await _send_json(send, status, body, headers + cors)
+
+
+async def lifespan(receive, send):
+    while True:
+        message = await receive()
+        if message['type'] == 'lifespan.startup':
+            await send({'type': 'lifespan.startup.complete'})
+        elif message['type'] == 'lifespan.shutdown':
+            ask_service.shutdown()
+            metrics.flush(force=True)
+            await send({'type': 'lifespan.shutdown.complete'})
+            return
+
+
+async def app(scope, receive, send):
+    if scope['type'] == 'http' and scope['method'] == 'POST' and scope['path'] in ASK_ROUTES:
+        await ask(scope, receive, send)
+    elif scope['type'] == 'lifespan':
+        await lifespan(receive, send)
+    else:
+        await wsgi_app(scope, receive, send)
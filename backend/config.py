@@ -6,3 +6,50 @@ load_dotenv()
 DATABASE_PATH = os.path.join(os.path.dirname(__file__), 'data', 'education_policy.db')
 ANTHROPIC_API_KEY = os.getenv('ANTHROPIC_API_KEY', '')
 CONGRESS_API_KEY = os.getenv('CONGRESS_API_KEY', '')
+
+# Shared Anthropic client (services/claude_service.py)
+ANTHROPIC_TIMEOUT = float(os.getenv('ANTHROPIC_TIMEOUT', 60))  # seconds per request
+ANTHROPIC_CONNECT_TIMEOUT = float(os.getenv('ANTHROPIC_CONNECT_TIMEOUT', 5))
+ANTHROPIC_MAX_RETRIES = int(os.getenv('ANTHROPIC_MAX_RETRIES', 2))
+ANTHROPIC_MAX_CONNECTIONS = int(os.getenv('ANTHROPIC_MAX_CONNECTIONS', 20))
+ANTHROPIC_KEEPALIVE_EXPIRY = float(os.getenv('ANTHROPIC_KEEPALIVE_EXPIRY', 60))  # seconds an idle connection is kept
+
+# SQLite connection tuning (applied to every pooled connection)
+SQLITE_MMAP_SIZE = int(os.getenv('SQLITE_MMAP_SIZE', 256 * 1024 * 1024))
+SQLITE_CACHE_SIZE_KB = int(os.getenv('SQLITE_CACHE_SIZE_KB', 64 * 1024))
+SQLITE_BUSY_TIMEOUT_MS = int(os.getenv('SQLITE_BUSY_TIMEOUT_MS', 5000))
+
+# HTTP caching for read endpoints
+HTTP_CACHE_MAX_AGE = int(os.getenv('HTTP_CACHE_MAX_AGE', 60))
+DATA_VERSION_TTL = float(os.getenv('DATA_VERSION_TTL', 5))  # seconds between version checks
+
+# Memory-mapped semantic index built by scripts/build_vector_index.py (optional, needs numpy)
+VECTOR_INDEX_DIR = os.getenv('VECTOR_INDEX_DIR', os.path.join(os.path.dirname(__file__), 'data', 'vector_index'))
+
+# Approximate token budget for the policy context sent with each /api/ask question
+CONTEXT_TOKEN_BUDGET = int(os.getenv('CONTEXT_TOKEN_BUDGET', 3000))
+
+# /api/ask answer cache (separate SQLite file, shared by all workers)
+ANSWER_CACHE_ENABLED = os.getenv('ANSWER_CACHE_ENABLED', '1') != '0'
+ANSWER_CACHE_PATH = os.getenv('ANSWER_CACHE_PATH', os.path.join(os.path.dirname(__file__), 'data', 'answer_cache.db'))
+ANSWER_CACHE_TTL = int(os.getenv('ANSWER_CACHE_TTL', 7 * 24 * 3600))  # seconds
+ANSWER_CACHE_MAX_ENTRIES = int(os.getenv('ANSWER_CACHE_MAX_ENTRIES', 2000))
+
+# /api/ask per-IP token bucket (separate SQLite file, shared by all workers)
+RATE_LIMIT_PATH = os.getenv('RATE_LIMIT_PATH', os.path.join(os.path.dirname(__file__), 'data', 'rate_limit.db'))
+RATE_LIMIT_PER_MINUTE = float(os.getenv('RATE_LIMIT_PER_MINUTE', 10))
+RATE_LIMIT_BURST = float(os.getenv('RATE_LIMIT_BURST', 10))
+
+# Parquet snapshots served by /api/export?format=parquet (scripts/export_parquet.py)
+EXPORT_DIR = os.getenv('EXPORT_DIR', os.path.join(os.path.dirname(__file__), 'data', 'exports'))
+
+# ASGI mode (asgi.py): threads running the Flask app, threads for /api/ask SQLite work,
+# and per-worker Claude slots for /api/ask (questions wait up to ASK_QUEUE_TIMEOUT for one)
+ASGI_WSGI_THREADS = int(os.getenv('ASGI_WSGI_THREADS', 16))
+ASK_DB_THREADS = int(os.getenv('ASK_DB_THREADS', 4))
+ASK_MAX_CONCURRENCY = int(os.getenv('ASK_MAX_CONCURRENCY', 32))
+ASK_QUEUE_TIMEOUT = float(os.getenv('ASK_QUEUE_TIMEOUT', 10))  # seconds
+
+# On-disk Congress.gov response cache: off, on, replay or offline (see services/response_cache.py)
+CONGRESS_CACHE_MODE = os.getenv('CONGRESS_CACHE_MODE', 'off')
+CONGRESS_CACHE_DIR = os.getenv('CONGRESS_CACHE_DIR', os.path.join(os.path.dirname(__file__), 'data', 'cache', 'congress'))
@@ -0,0 +1,189 @@
+"""In-process request, SQL and Claude metrics with Prometheus text output.
+
+Each worker keeps its own counters and histograms and periodically writes a
+snapshot to METRICS_DIR/<pid>.json; /api/metrics sums the snapshots of all
+workers. The default METRICS_DIR is keyed on the parent (gunicorn master)
+pid, so a new deploy starts from empty counters.
+
+Per-request timings (SQL time and statement count, Claude time) accumulate
+in a context variable so the app can emit Server-Timing headers.
+"""
+
+import contextvars
+import glob
+import json
+import os
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+
+METRICS_DIR = os.getenv('METRICS_DIR') or os.path.join(
+    tempfile.gettempdir(), f'statescope-metrics-{os.getppid()}')
+FLUSH_INTERVAL = 1.0  # seconds between snapshot writes per worker
+
+BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+HELP = {
+    'statescope_http_request_duration_seconds': ('histogram', 'Request latency by route'),
+    'statescope_sql_duration_seconds': ('histogram', 'SQLite time per request by route'),
+    'statescope_sql_statements_total': ('counter', 'SQLite statements executed, by route'),
+    'statescope_claude_duration_seconds': ('histogram', 'Claude API call latency'),
+    'statescope_claude_tokens_total': ('counter', 'Claude tokens by kind'),
+    'statescope_claude_prompt_cache_total': ('counter', 'Claude calls by prompt cache result (hit, write, uncached)'),
+    'statescope_ask_queue_duration_seconds': ('histogram', 'Wait for a Claude slot in ASGI mode'),
+    'statescope_ask_rejected_total': ('counter', 'Questions rejected after waiting ASK_QUEUE_TIMEOUT for a Claude slot'),
+}
+
+_lock = threading.Lock()
+_histograms = {}   # (name, labels) -> [bucket counts..., sum, count]
+_counters = {}     # (name, labels) -> value
+_last_flush = 0.0
+_request = contextvars.ContextVar('request_timings', default=None)
+
+
+def _key(name, labels):
+    return name, tuple(sorted(labels.items()))
+
+
+def observe(name, seconds, **labels):
+    """Record one observation in a histogram."""
+    with _lock:
+        h = _histograms.get(_key(name, labels))
+        if h is None:
+            h = _histograms[_key(name, labels)] = [0] * len(BUCKETS) + [0.0, 0]
+        for i, bound in enumerate(BUCKETS):
+            if seconds <= bound:
+                h[i] += 1
+        h[-2] += seconds
+        h[-1] += 1
+
+
+def inc(name, value=1, **labels):
+    """Increment a counter."""
+    with _lock:
+        key = _key(name, labels)
+        _counters[key] = _counters.get(key, 0) + value
+
+
+# -- per-request timings ----------------------------------------------------
+
+def begin_request():
+    """Start collecting timings for the current request; returns a token."""
+    return _request.set({'start': time.perf_counter(), 'db': 0.0, 'sql_statements': 0, 'claude': 0.0})
+
+
+def end_request(token):
+    """Stop collecting and return the request's timings (seconds)."""
+    timings = _request.get()
+    _request.reset(token)
+    timings['total'] = time.perf_counter() - timings.pop('start')
+    return timings
+
+
+def add_timing(name, seconds):
+    timings = _request.get()
+    if timings is not None:
+        timings[name] = timings.get(name, 0.0) + seconds
+
+
+def on_sql_statement(statement):
+    """sqlite3 trace callback: count every statement run for this request."""
+    timings = _request.get()
+    if timings is not None:
+        timings['sql_statements'] += 1
+
+
+@contextmanager
+def timed(name):
+    """Time a block into the request's timings and statescope_<name>_duration_seconds."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        add_timing(name, elapsed)
+        observe(f'statescope_{name}_duration_seconds', elapsed)
+
+
+def server_timing(timings):
+    """Server-Timing header value for a finished request."""
+    app_time = max(timings['total'] - timings['db'] - timings['claude'], 0.0)
+    parts = [f'db;dur={timings["db"] * 1000:.2f};desc="{timings["sql_statements"]} statements"']
+    if timings['claude']:
+        parts.append(f'claude;dur={timings["claude"] * 1000:.2f}')
+    parts.append(f'app;dur={app_time * 1000:.2f}')
+    parts.append(f'total;dur={timings["total"] * 1000:.2f}')
+    return ', '.join(parts)
+
+
+# -- cross-worker aggregation -----------------------------------------------
+
+def _snapshot():
+    with _lock:
+        return {
+            'histograms': [[name, list(labels), list(values)] for (name, labels), values in _histograms.items()],
+            'counters': [[name, list(labels), value] for (name, labels), value in _counters.items()],
+        }
+
+
+def flush(force=False):
+    """Write this worker's snapshot for /api/metrics (rate limited unless force)."""
+    global _last_flush
+    now = time.monotonic()
+    if not force and now - _last_flush < FLUSH_INTERVAL:
+        return
+    _last_flush = now
+    os.makedirs(METRICS_DIR, exist_ok=True)
+    path = os.path.join(METRICS_DIR, f'{os.getpid()}.json')
+    tmp_path = f'{path}.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump(_snapshot(), f)
+    os.replace(tmp_path, path)
+
+
+def _labels_text(labels):
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{k}="{v}"' for k, v in labels) + '}'
+
+
+def render_prometheus():
+    """Sum every worker's snapshot and render Prometheus text exposition format."""
+    flush(force=True)
+    histograms = {}
+    counters = {}
+    for path in glob.glob(os.path.join(METRICS_DIR, '*.json')):
+        try:
+            with open(path) as f:
+                snap = json.load(f)
+        except (OSError, ValueError):
+            continue
+        for name, labels, values in snap['histograms']:
+            key = (name, tuple(tuple(l) for l in labels))
+            total = histograms.setdefault(key, [0] * len(values))
+            histograms[key] = [a + b for a, b in zip(total, values)]
+        for name, labels, value in snap['counters']:
+            key = (name, tuple(tuple(l) for l in labels))
+            counters[key] = counters.get(key, 0) + value
+
+    lines = []
+    described = set()
+
+    def describe(name, kind):
+        if name not in described:
+            described.add(name)
+            lines.append(f'# HELP {name} {HELP.get(name, (kind, name))[1]}')
+            lines.append(f'# TYPE {name} {kind}')
+
+    for (name, labels), values in sorted(histograms.items()):
+        describe(name, 'histogram')
+        for bound, count in zip(BUCKETS, values):
+            lines.append(f'{name}_bucket{_labels_text(labels + (("le", str(bound)),))} {count}')
+        lines.append(f'{name}_bucket{_labels_text(labels + (("le", "+Inf"),))} {values[-1]}')
+        lines.append(f'{name}_sum{_labels_text(labels)} {values[-2]}')
+        lines.append(f'{name}_count{_labels_text(labels)} {values[-1]}')
+    for (name, labels), value in sorted(counters.items()):
+        describe(name, 'counter')
+        lines.append(f'{name}{_labels_text(labels)} {value}')
+    return '\n'.join(lines) + '\n'
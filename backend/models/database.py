@@ -1,8 +1,159 @@
+"""Pooled SQLite connections.
+
+Each worker thread opens one tuned connection per (database, mode) pair and
+reuses it for every request it serves, instead of connecting per query.
+Calling close() on a pooled connection only resets it and hands it back.
+"""
+
+import atexit
+import os
 import sqlite3
+import threading
+import time
+
 import config
+import metrics
+
+_local = threading.local()
+_lock = threading.Lock()
+_connections = set()
+_stats = {'opened': 0, 'reused': 0, 'released': 0, 'closed': 0}
+
+
+class TimedCursor(sqlite3.Cursor):
+    """Cursor that charges time spent executing and bulk-fetching to the request.
+
+    fetchone() and row iteration are left to the C implementation: a Python
+    hook per row would cost more than the fetch it measures.
+    """
+
+    def execute(self, *args):
+        start = time.perf_counter()
+        try:
+            return super().execute(*args)
+        finally:
+            metrics.add_timing('db', time.perf_counter() - start)
+
+    def executemany(self, *args):
+        start = time.perf_counter()
+        try:
+            return super().executemany(*args)
+        finally:
+            metrics.add_timing('db', time.perf_counter() - start)
+
+    def fetchmany(self, *args):
+        start = time.perf_counter()
+        try:
+            return super().fetchmany(*args)
+        finally:
+            metrics.add_timing('db', time.perf_counter() - start)
+
+    def fetchall(self):
+        start = time.perf_counter()
+        try:
+            return super().fetchall()
+        finally:
+            metrics.add_timing('db', time.perf_counter() - start)
+
+class PooledConnection(sqlite3.Connection):
+    """sqlite3 connection whose close() returns it to the pool.
+
+    Statements run through TimedCursor and are counted by a trace callback,
+    so per-request SQL time and statement counts show up in metrics.
+    """
+
+    def cursor(self, factory=TimedCursor):
+        return super().cursor(factory)
+
+    def execute(self, *args):
+        return self.cursor().execute(*args)
+
+    def executemany(self, *args):
+        return self.cursor().executemany(*args)
 
+    def close(self):
+        if self.in_transaction:
+            self.rollback()
+        with _lock:
+            _stats['released'] += 1
 
-def get_db():
-    db = sqlite3.connect(config.DATABASE_PATH)
+    def discard(self):
+        """Really close the underlying connection."""
+        with _lock:
+            if self in _connections:
+                _connections.discard(self)
+                _stats['closed'] += 1
+        super().close()
+
+
+def _open(path, readonly):
+    db = sqlite3.connect(path, factory=PooledConnection, check_same_thread=False)
     db.row_factory = sqlite3.Row
+    db.owner_pid = os.getpid()
+    db.set_trace_callback(metrics.on_sql_statement)
+    try:
+        db.execute('PRAGMA journal_mode = WAL')
+    except sqlite3.OperationalError:
+        pass  # read-only filesystem; keep the existing journal mode
+    db.execute('PRAGMA synchronous = NORMAL')
+    db.execute(f'PRAGMA busy_timeout = {int(config.SQLITE_BUSY_TIMEOUT_MS)}')
+    db.execute(f'PRAGMA mmap_size = {int(config.SQLITE_MMAP_SIZE)}')
+    db.execute(f'PRAGMA cache_size = -{int(config.SQLITE_CACHE_SIZE_KB)}')
+    db.execute('PRAGMA temp_store = MEMORY')
+    if readonly:
+        db.execute('PRAGMA query_only = ON')
+    with _lock:
+        _connections.add(db)
+        _stats['opened'] += 1
+    return db
+
+
+def get_db(readonly=True, path=None):
+    """Return this thread's pooled connection to path (default: main DB).
+
+    Read paths get a query_only connection; pass readonly=False to write.
+    """
+    path = path or config.DATABASE_PATH
+    pool = getattr(_local, 'pool', None)
+    if pool is None:
+        pool = _local.pool = {}
+
+    key = (path, readonly)
+    db = pool.get(key)
+    if db is not None and db.owner_pid != os.getpid():
+        # Inherited across a fork: never reuse (or close) the parent's handle
+        db = None
+    if db is None:
+        db = pool[key] = _open(path, readonly)
+    else:
+        with _lock:
+            _stats['reused'] += 1
     return db
+
+
+def release_db(exc=None):
+    """Reset this thread's connections; registered as a Flask teardown."""
+    for db in getattr(_local, 'pool', {}).values():
+        if db.owner_pid == os.getpid() and db.in_transaction:
+            db.rollback()
+
+
+def close_all():
+    """Close every pooled connection opened by this process."""
+    with _lock:
+        conns = [db for db in _connections if db.owner_pid == os.getpid()]
+    for db in conns:
+        db.discard()
+
+
+def pool_stats():
+    """Counters describing connection reuse in this process."""
+    with _lock:
+        stats = dict(_stats)
+        stats['open'] = len(_connections)
+    checkouts = stats['opened'] + stats['reused']
+    stats['reuse_rate'] = round(stats['reused'] / checkouts, 4) if checkouts else 0.0
+    return stats
+
+
+atexit.register(close_all)
@@ -0,0 +1,130 @@
+"""Set-based bulk upsert of policies and their topic links, plus document storage.
+
+Policies are matched on their natural keys, enforced by unique indexes:
+(state, bill_number) for bills and (state, title) for policies without a
+bill number (guidance, executive orders). Everything runs as a handful of
+executemany / set statements inside the caller's transaction.
+"""
+
+from services.topic_classifier import classify_policy
+
+UPSERT_SQL = '''
+    INSERT INTO policies
+        (state_id, title, description, policy_type, level, status,
+         date_introduced, date_enacted, bill_number, sponsor, summary_text, source_url)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT (COALESCE(state_id, 0), bill_number) WHERE bill_number IS NOT NULL DO UPDATE SET
+        title = excluded.title, description = excluded.description,
+        policy_type = excluded.policy_type, level = excluded.level, status = excluded.status,
+        date_introduced = excluded.date_introduced, date_enacted = excluded.date_enacted,
+        sponsor = excluded.sponsor, summary_text = excluded.summary_text,
+        source_url = excluded.source_url
+    ON CONFLICT (COALESCE(state_id, 0), title) WHERE bill_number IS NULL DO UPDATE SET
+        description = excluded.description,
+        policy_type = excluded.policy_type, level = excluded.level, status = excluded.status,
+        date_introduced = excluded.date_introduced, date_enacted = excluded.date_enacted,
+        sponsor = excluded.sponsor, summary_text = excluded.summary_text,
+        source_url = excluded.source_url
+'''
+
+# Resolve staged natural keys to policy ids; each branch uses one unique index
+_RESOLVE_SQL = '''
+    SELECT k.seq, p.id FROM _ingest_keys k
+    JOIN policies p ON COALESCE(p.state_id, 0) = k.state_key AND p.bill_number = k.bill_number
+    WHERE k.bill_number IS NOT NULL
+    UNION ALL
+    SELECT k.seq, p.id FROM _ingest_keys k
+    JOIN policies p ON COALESCE(p.state_id, 0) = k.state_key AND p.title = k.title
+                   AND p.bill_number IS NULL
+    WHERE k.bill_number IS NULL
+'''
+
+
+def _resolve_ids(db):
+    return dict(db.execute(_RESOLVE_SQL).fetchall())
+
+
+def bulk_upsert_policies(db, policies, state_map, topic_map):
+    """Insert or update many policies and replace their topic links.
+
+    Args:
+        db: sqlite3 connection (not committed here)
+        policies: dicts with the policies columns plus 'state' (code or
+            None for federal), 'topics' (list of topic names; missing
+            means classify, an empty list means untagged) and optionally
+            'subjects' (extra classifier input such as Congress.gov
+            legislative subjects)
+        state_map: state code -> states.id
+        topic_map: topic name -> topics.id
+
+    Returns:
+        (policy_ids, new_count): ids aligned with the input order and the
+        number of policies that did not exist before
+    """
+    rows = []
+    keys = []
+    for seq, p in enumerate(policies):
+        state_id = state_map.get(p['state']) if p.get('state') else None
+        bill_number = p.get('bill_number') or None
+        rows.append((
+            state_id, p['title'], p.get('description'), p['policy_type'],
+            p['level'], p['status'], p.get('date_introduced'), p.get('date_enacted'),
+            bill_number, p.get('sponsor'), p.get('summary_text'), p.get('source_url'),
+        ))
+        keys.append((seq, state_id or 0, bill_number, p['title']))
+
+    db.execute('DROP TABLE IF EXISTS temp._ingest_keys')
+    db.execute('CREATE TEMP TABLE _ingest_keys (seq INTEGER PRIMARY KEY, state_key INTEGER, bill_number TEXT, title TEXT)')
+    db.executemany('INSERT INTO _ingest_keys VALUES (?, ?, ?, ?)', keys)
+
+    existing = set(_resolve_ids(db).values())
+    db.executemany(UPSERT_SQL, rows)
+    ids_by_seq = _resolve_ids(db)
+    policy_ids = [ids_by_seq[seq] for seq in range(len(policies))]
+
+    # Replace topic links for every touched policy: curated topics when the
+    # data lists them (possibly none), otherwise the shared keyword classifier's
+    db.executemany('DELETE FROM policy_topics WHERE policy_id = ?',
+                   [(policy_id,) for policy_id in set(policy_ids)])
+    links = []
+    for policy_id, p in zip(policy_ids, policies):
+        if 'topics' in p:
+            topic_names, source = p['topics'] or [], 'curated'
+        else:
+            topic_names = classify_policy(p['title'], p.get('description'), p.get('summary_text'),
+                                          p.get('subjects'))
+            source = 'classifier'
+        for topic_name in topic_names:
+            topic_id = topic_map.get(topic_name)
+            if topic_id:
+                links.append((policy_id, topic_id, source))
+    db.executemany('INSERT OR IGNORE INTO policy_topics (policy_id, topic_id, source) VALUES (?, ?, ?)', links)
+
+    db.execute('DROP TABLE temp._ingest_keys')
+    new_count = len(set(policy_ids) - existing)
+    return policy_ids, new_count
+
+
+def replace_document(db, doc, state_id=None, policy_id=None, date_added=None):
+    """Store an extracted document and its chunks, replacing any earlier
+    copy with the same source_url. Chunk rows index into doc['text'] by
+    their (start, end) offsets; the FTS triggers index them.
+
+    Returns the new documents.id (not committed here).
+    """
+    old_ids = [r[0] for r in db.execute('SELECT id FROM documents WHERE source_url = ?', (doc['source'],))]
+    if old_ids:
+        marks = ','.join('?' * len(old_ids))
+        db.execute(f'DELETE FROM document_chunks WHERE document_id IN ({marks})', old_ids)
+        db.execute(f'DELETE FROM documents WHERE id IN ({marks})', old_ids)
+
+    document_id = db.execute('''
+        INSERT INTO documents (state_id, policy_id, title, doc_type, source_url, extracted_text, date_added)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+    ''', (state_id, policy_id, doc['title'], doc['doc_type'], doc['source'], doc['text'], date_added)).lastrowid
+    text = doc['text']
+    db.executemany('''
+        INSERT INTO document_chunks (document_id, chunk_index, start_offset, end_offset, text)
+        VALUES (?, ?, ?, ?, ?)
+    ''', ((document_id, i, start, end, text[start:end]) for i, (start, end) in enumerate(doc['chunks'])))
+    return document_id
@@ -0,0 +1,165 @@
+"""Derived tables that ingestion rebuilds after loading policies.
+
+Read endpoints serve these instead of aggregating the base tables on every
+request. Call refresh_materialized(db) before committing any write to
+policies or policy_topics.
+"""
+
+import json
+import re
+
+CHARS_PER_TOKEN = 4          # rough English average for Claude's tokenizer
+SNIPPET_SUMMARY_TOKENS = 250  # longest summary kept in a stored snippet
+
+_SENTENCE_END = re.compile(r'[.!?]["\')\]]?\s')
+
+
+def estimate_tokens(text):
+    """Approximate token count of text (no tokenizer round trip)."""
+    return -(-len(text) // CHARS_PER_TOKEN)
+
+
+def truncate_to_tokens(text, max_tokens):
+    """Cut text to about max_tokens, preferring a sentence then a word boundary."""
+    limit = max_tokens * CHARS_PER_TOKEN
+    if len(text) <= limit:
+        return text
+    cut = text[:limit]
+    sentence_ends = [m.end() for m in _SENTENCE_END.finditer(cut)]
+    if sentence_ends and sentence_ends[-1] > limit // 2:
+        return cut[:sentence_ends[-1]].rstrip()
+    space = cut.rfind(' ')
+    return (cut[:space] if space > limit // 2 else cut).rstrip(' ,;:') + '…'
+
+
+def render_snippet(title, location, policy_type, status, date_introduced, bill_number, summary_text):
+    """Context entry for one policy, without its [n] citation marker."""
+    lines = [
+        title,
+        f"    Location: {location or 'Federal'}",
+        f"    Type: {policy_type} | Status: {status}",
+    ]
+    if date_introduced:
+        lines.append(f"    Introduced: {date_introduced}")
+    if bill_number:
+        lines.append(f"    Bill: {bill_number}")
+    if summary_text:
+        lines.append(f"    Summary: {truncate_to_tokens(summary_text, SNIPPET_SUMMARY_TOKENS)}")
+    return '\n'.join(lines)
+
+
+def refresh_state_summary(db):
+    """Recompute policy_count and the map status for every state."""
+    db.execute('DELETE FROM state_summary')
+    db.execute('''
+        INSERT INTO state_summary (state_id, policy_count, policy_status)
+        SELECT s.id,
+               COUNT(p.id),
+               CASE
+                   WHEN MAX(CASE WHEN p.status = 'enacted' OR (p.policy_type = 'executive_order' AND p.status = 'active') THEN 1 ELSE 0 END) = 1 THEN 'enacted'
+                   WHEN MAX(CASE WHEN p.status = 'introduced' THEN 1 ELSE 0 END) = 1 THEN 'pending'
+                   WHEN MAX(CASE WHEN p.policy_type = 'guidance' OR p.status = 'active' THEN 1 ELSE 0 END) = 1 THEN 'guidance'
+                   WHEN MAX(CASE WHEN p.status = 'failed' THEN 1 ELSE 0 END) = 1 THEN 'failed'
+                   ELSE 'none'
+               END
+        FROM states s
+        LEFT JOIN policies p ON p.state_id = s.id
+        GROUP BY s.id
+    ''')
+
+
+def refresh_trends_cube(db):
+    """Re-aggregate trends_cube from policies and policy_topics."""
+    db.execute('DELETE FROM trends_cube')
+    db.execute('''
+        INSERT INTO trends_cube (year, state_id, topic_id, policy_type, status, level, count)
+        SELECT strftime('%Y', date_introduced), state_id, 0, policy_type, status, level, COUNT(*)
+        FROM policies
+        GROUP BY 1, 2, 4, 5, 6
+    ''')
+    db.execute('''
+        INSERT INTO trends_cube (year, state_id, topic_id, policy_type, status, level, count)
+        SELECT strftime('%Y', p.date_introduced), p.state_id, pt.topic_id,
+               p.policy_type, p.status, p.level, COUNT(*)
+        FROM policies p
+        JOIN policy_topics pt ON pt.policy_id = p.id
+        GROUP BY 1, 2, 3, 4, 5, 6
+    ''')
+
+    # Rollups for the 1-D endpoints, aggregated from the cube itself
+    db.execute('DELETE FROM trends_topic_counts')
+    db.execute('''
+        INSERT INTO trends_topic_counts (topic_id, state_id, policy_type, count)
+        SELECT topic_id, state_id, policy_type, SUM(count)
+        FROM trends_cube
+        WHERE topic_id != 0
+        GROUP BY 1, 2, 3
+    ''')
+    db.execute('DELETE FROM trends_breakdown')
+    for dimension in ('status', 'level'):
+        db.execute(f'''
+            INSERT INTO trends_breakdown (dimension, value, count)
+            SELECT '{dimension}', {dimension}, SUM(count)
+            FROM trends_cube
+            WHERE topic_id = 0
+            GROUP BY 2
+        ''')
+
+    db.execute('DELETE FROM trends_cube_encoded')
+    db.execute('INSERT INTO trends_cube_encoded (id, body) VALUES (1, ?)', (encode_trends_cube(db),))
+
+
+def encode_trends_cube(db):
+    """The whole trends cube as compact, dictionary-encoded JSON.
+
+    {"dimensions": {name: [values]}, "columns": [...], "rows": [[...]]},
+    where each row holds an index into every dimension followed by the
+    count. In the topic dimension, null means "all policies" (each policy
+    counted once).
+    """
+    rows = db.execute('''
+        SELECT c.year, s.code, t.name, c.policy_type, c.status, c.level, c.count
+        FROM trends_cube c
+        LEFT JOIN states s ON s.id = c.state_id
+        LEFT JOIN topics t ON t.id = c.topic_id
+    ''').fetchall()
+
+    names = ['year', 'state', 'topic', 'policy_type', 'status', 'level']
+    values = [sorted({r[i] for r in rows}, key=lambda v: (v is not None, v or '')) for i in range(len(names))]
+    index = [{v: i for i, v in enumerate(vals)} for vals in values]
+    encoded = [[index[i][r[i]] for i in range(len(names))] + [r[-1]] for r in rows]
+    return json.dumps({'dimensions': dict(zip(names, values)), 'columns': names + ['count'], 'rows': encoded},
+                      separators=(',', ':'))
+
+
+def refresh_policy_snippets(db):
+    """Re-render the stored Q&A context snippet for every policy."""
+    db.execute('DELETE FROM policy_snippets')
+    rows = db.execute('''
+        SELECT p.id, p.title, s.name, p.policy_type, p.status,
+               p.date_introduced, p.bill_number, p.summary_text
+        FROM policies p
+        LEFT JOIN states s ON p.state_id = s.id
+    ''')
+    snippets = ((row[0], render_snippet(*row[1:])) for row in rows)
+    db.executemany(
+        'INSERT INTO policy_snippets (policy_id, snippet, token_estimate) VALUES (?, ?, ?)',
+        ((policy_id, snippet, estimate_tokens(snippet)) for policy_id, snippet in snippets))
+
+
+def bump_data_version(db):
+    """Advance the data version so cached read responses are revalidated."""
+    db.execute('''
+        UPDATE data_version
+        SET version = version + 1,
+            updated_at = CAST(strftime('%s', 'now') AS INTEGER)
+        WHERE id = 1
+    ''')
+
+
+def refresh_materialized(db):
+    """Rebuild every derived table and bump the data version. Does not commit."""
+    refresh_state_summary(db)
+    refresh_trends_cube(db)
+    refresh_policy_snippets(db)
+    bump_data_version(db)
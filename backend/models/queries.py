@@ -1,40 +1,55 @@
+import base64
+import json
+import re
+
 from models.database import get_db
 
+# bm25() column weights for policies_fts: title, description, summary_text
+FTS_WEIGHTS = (2.0, 1.0, 1.0)
+
+_TOKEN_RE = re.compile(r'\w+')
+
+# Meaningful-word filter applied to questions before building the FTS query
+STOP_WORDS = {
+    'the', 'a', 'an', 'is', 'are', 'was', 'were', 'do', 'does', 'did',
+    'has', 'have', 'had', 'what', 'which', 'who', 'how', 'when', 'where',
+    'why', 'can', 'will', 'would', 'should', 'could', 'about', 'with',
+    'from', 'for', 'and', 'but', 'or', 'not', 'this', 'that', 'any',
+    'all', 'each', 'been', 'being', 'their', 'there', 'they', 'them',
+    'than', 'into', 'some', 'such', 'its', 'also', 'most', 'more',
+}
+
+
+def fts_terms(text):
+    """Split free text into lowercase word tokens usable in an FTS5 query."""
+    return _TOKEN_RE.findall(text.lower())
+
+
+def fts_match_expression(terms, operator='OR'):
+    """Build an FTS5 MATCH expression of quoted prefix terms joined by operator."""
+    return f' {operator} '.join('"{}"*'.format(t.replace('"', '""')) for t in terms)
+
+
+def get_data_version():
+    """Return (version, updated_at) for the currently loaded data."""
+    db = get_db()
+    row = db.execute('SELECT version, updated_at FROM data_version WHERE id = 1').fetchone()
+    db.close()
+    return (row['version'], row['updated_at']) if row else (0, 0)
+
 
 def get_all_states():
     db = get_db()
     rows = db.execute('''
         SELECT s.*,
-               COUNT(p.id) as policy_count,
-               MAX(CASE WHEN p.status = 'enacted' OR (p.policy_type = 'executive_order' AND p.status = 'active') THEN 1 ELSE 0 END) as has_enacted,
-               MAX(CASE WHEN p.status = 'introduced' THEN 1 ELSE 0 END) as has_pending,
-               MAX(CASE WHEN p.policy_type = 'guidance' OR p.status = 'active' THEN 1 ELSE 0 END) as has_guidance,
-               MAX(CASE WHEN p.status = 'failed' THEN 1 ELSE 0 END) as has_failed
+               COALESCE(ss.policy_count, 0) as policy_count,
+               COALESCE(ss.policy_status, 'none') as policy_status
         FROM states s
-        LEFT JOIN policies p ON p.state_id = s.id
-        GROUP BY s.id
+        LEFT JOIN state_summary ss ON ss.state_id = s.id
         ORDER BY s.name
     ''').fetchall()
     db.close()
-    results = []
-    for r in rows:
-        d = dict(r)
-        if d['has_enacted']:
-            d['policy_status'] = 'enacted'
-        elif d['has_pending']:
-            d['policy_status'] = 'pending'
-        elif d['has_guidance']:
-            d['policy_status'] = 'guidance'
-        elif d['has_failed']:
-            d['policy_status'] = 'failed'
-        else:
-            d['policy_status'] = 'none'
-        del d['has_enacted']
-        del d['has_pending']
-        del d['has_guidance']
-        del d['has_failed']
-        results.append(d)
-    return results
+    return [dict(r) for r in rows]
 
 
 def get_state_policies(state_code):
@@ -49,9 +64,9 @@ def get_state_policies(state_code):
     return [dict(r) for r in rows]
 
 
-def get_all_policies(level=None, status=None, topic_id=None, limit=50, offset=0):
-    db = get_db()
-    query = 'SELECT p.* FROM policies p'
+def _policy_filters(level=None, status=None, topic_id=None, state_code=None, columns='p.*'):
+    """FROM clause, WHERE conditions and params shared by the policy list queries."""
+    query = f'SELECT {columns} FROM policies p'
     params = []
     conditions = []
 
@@ -68,10 +83,21 @@ def get_all_policies(level=None, status=None, topic_id=None, limit=50, offset=0)
         conditions.append('p.status = ?')
         params.append(status)
 
+    if state_code:
+        conditions.append('p.state_id = (SELECT id FROM states WHERE code = ?)')
+        params.append(state_code.upper())
+
+    return query, conditions, params
+
+
+def get_all_policies(level=None, status=None, topic_id=None, limit=50, offset=0):
+    db = get_db()
+    query, conditions, params = _policy_filters(level, status, topic_id)
+
     if conditions:
         query += ' WHERE ' + ' AND '.join(conditions)
 
-    query += ' ORDER BY p.date_introduced DESC LIMIT ? OFFSET ?'
+    query += ' ORDER BY p.date_introduced DESC, p.id DESC LIMIT ? OFFSET ?'
     params.extend([limit, offset])
 
     rows = db.execute(query, params).fetchall()
@@ -79,6 +105,106 @@ def get_all_policies(level=None, status=None, topic_id=None, limit=50, offset=0)
     return [dict(r) for r in rows]
 
 
+def encode_cursor(policy):
+    """Opaque keyset cursor for the position just after policy."""
+    raw = json.dumps([policy['date_introduced'], policy['id']]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    """Inverse of encode_cursor. Raises ValueError on a malformed cursor."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        date_introduced, policy_id = json.loads(raw)
+    except (ValueError, TypeError) as e:
+        raise ValueError('Invalid cursor') from e
+    if not isinstance(policy_id, int) or not isinstance(date_introduced, (str, type(None))):
+        raise ValueError('Invalid cursor')
+    return date_introduced, policy_id
+
+
+def get_policies_page(level=None, status=None, topic_id=None, limit=50, cursor=None):
+    """Keyset-paginated variant of get_all_policies.
+
+    Same filters and order (date_introduced DESC, id DESC, undated last),
+    but each page seeks straight to the cursor position instead of
+    skipping OFFSET rows. Returns (policies, next_cursor); next_cursor is
+    None on the last page.
+    """
+    after = decode_cursor(cursor) if cursor else None
+    db = get_db()
+    base, conditions, params = _policy_filters(level, status, topic_id)
+    rows = []
+
+    # Dated policies first, as one index range scan below the cursor
+    if after is None or after[0] is not None:
+        dated = conditions + ['p.date_introduced IS NOT NULL']
+        dated_params = list(params)
+        if after:
+            dated.append('(p.date_introduced, p.id) < (?, ?)')
+            dated_params.extend(after)
+        rows = db.execute(
+            f"{base} WHERE {' AND '.join(dated)} ORDER BY p.date_introduced DESC, p.id DESC LIMIT ?",
+            dated_params + [limit + 1],
+        ).fetchall()
+
+    # Then undated policies, once the dated ones are exhausted
+    if len(rows) <= limit:
+        undated = conditions + ['p.date_introduced IS NULL']
+        undated_params = list(params)
+        if after and after[0] is None:
+            undated.append('p.id < ?')
+            undated_params.append(after[1])
+        rows += db.execute(
+            f"{base} WHERE {' AND '.join(undated)} ORDER BY p.id DESC LIMIT ?",
+            undated_params + [limit + 1 - len(rows)],
+        ).fetchall()
+    db.close()
+
+    page = [dict(r) for r in rows[:limit]]
+    next_cursor = encode_cursor(page[-1]) if page and len(rows) > limit else None
+    return page, next_cursor
+
+
+EXPORT_COLUMNS = (
+    'id', 'state', 'level', 'policy_type', 'status', 'title', 'description', 'date_introduced',
+    'date_enacted', 'bill_number', 'sponsor', 'summary_text', 'source_url', 'topics',
+)
+EXPORT_BATCH_SIZE = 500
+
+
+def iter_policies(level=None, status=None, topic_id=None, state_code=None, batch_size=EXPORT_BATCH_SIZE):
+    """Yield lists of up to batch_size export rows (EXPORT_COLUMNS tuples), in id order.
+
+    Rows come from a single SELECT read with fetchmany, so memory stays
+    constant however many policies match and the whole export sees one
+    consistent snapshot. topics is a '; '-separated list of topic names.
+    """
+    columns = f"""p.id, (SELECT code FROM states WHERE id = p.state_id) AS state,
+        {', '.join(f'p.{c}' for c in EXPORT_COLUMNS[2:-1])},
+        (SELECT group_concat(name, '; ') FROM (
+            SELECT t.name FROM policy_topics ptn JOIN topics t ON t.id = ptn.topic_id
+            WHERE ptn.policy_id = p.id ORDER BY t.name)) AS topics"""
+    db = get_db()
+    query, conditions, params = _policy_filters(level, status, topic_id, state_code, columns=columns)
+    if conditions:
+        query += ' WHERE ' + ' AND '.join(conditions)
+    # Without a topic the rowid order is free; with one, idx_policy_topics_topic
+    # already yields policy ids in order
+    query += ' ORDER BY pt.policy_id' if topic_id else ' ORDER BY p.id'
+
+    rows = db.execute(query, params)
+    try:
+        while True:
+            batch = rows.fetchmany(batch_size)
+            if not batch:
+                break
+            yield [tuple(r) for r in batch]
+    finally:
+        rows.close()
+        db.close()
+
+
 def get_policy_by_id(policy_id):
     db = get_db()
     row = db.execute('SELECT * FROM policies WHERE id = ?', (policy_id,)).fetchone()
@@ -89,31 +215,25 @@ def get_policy_by_id(policy_id):
 def get_timeline_data(state_code=None, topic_id=None, policy_type=None):
     db = get_db()
     query = '''
-        SELECT strftime('%Y', p.date_introduced) as year,
-               COUNT(*) as count
-        FROM policies p
+        SELECT c.year, SUM(c.count) as count
+        FROM trends_cube c
     '''
     joins = []
-    conditions = ['p.date_introduced IS NOT NULL']
-    params = []
+    conditions = ['c.topic_id = ?', 'c.year IS NOT NULL']
+    params = [topic_id or 0]
 
     if state_code:
-        joins.append('JOIN states s ON p.state_id = s.id')
+        joins.append('JOIN states s ON c.state_id = s.id')
         conditions.append('s.code = ?')
         params.append(state_code.upper())
 
-    if topic_id:
-        joins.append('JOIN policy_topics pt ON pt.policy_id = p.id')
-        conditions.append('pt.topic_id = ?')
-        params.append(topic_id)
-
     if policy_type:
-        conditions.append('p.policy_type = ?')
+        conditions.append('c.policy_type = ?')
         params.append(policy_type)
 
     query = query + ' '.join(joins)
     query += ' WHERE ' + ' AND '.join(conditions)
-    query += ' GROUP BY year ORDER BY year'
+    query += ' GROUP BY c.year ORDER BY c.year'
 
     rows = db.execute(query, params).fetchall()
     db.close()
@@ -123,58 +243,61 @@ def get_timeline_data(state_code=None, topic_id=None, policy_type=None):
 def get_topic_counts(state_code=None, policy_type=None):
     db = get_db()
     query = '''
-        SELECT t.name, COUNT(pt.policy_id) as count
+        SELECT t.name, COALESCE(SUM(c.count), 0) as count
         FROM topics t
-        LEFT JOIN policy_topics pt ON pt.topic_id = t.id
+        LEFT JOIN trends_topic_counts c ON c.topic_id = t.id
     '''
-    joins = []
-    conditions = []
     params = []
 
-    if state_code or policy_type:
-        joins.append('LEFT JOIN policies p ON pt.policy_id = p.id')
-
     if state_code:
-        joins.append('LEFT JOIN states s ON p.state_id = s.id')
-        conditions.append('(s.code = ? OR pt.policy_id IS NULL)')
+        query += ' AND c.state_id = (SELECT id FROM states WHERE code = ?)'
         params.append(state_code.upper())
 
     if policy_type:
-        conditions.append('(p.policy_type = ? OR pt.policy_id IS NULL)')
+        query += ' AND c.policy_type = ?'
         params.append(policy_type)
 
-    query = query + ' '.join(joins)
-    if conditions:
-        query += ' WHERE ' + ' AND '.join(conditions)
-    query += ' GROUP BY t.id ORDER BY count DESC'
+    query += ' GROUP BY t.id'
+    if params:
+        # Filtered views list topics with matches plus topics nobody uses yet
+        query += '''
+            HAVING COUNT(c.topic_id) > 0
+                OR NOT EXISTS (SELECT 1 FROM trends_topic_counts x WHERE x.topic_id = t.id)
+        '''
+    query += ' ORDER BY count DESC'
 
     rows = db.execute(query, params).fetchall()
     db.close()
     return [dict(r) for r in rows]
 
 
-def get_status_breakdown():
+def _breakdown(dimension):
     db = get_db()
-    rows = db.execute('''
-        SELECT status, COUNT(*) as count
-        FROM policies
-        GROUP BY status
+    rows = db.execute(f'''
+        SELECT value as {dimension}, count
+        FROM trends_breakdown
+        WHERE dimension = ?
         ORDER BY count DESC
-    ''').fetchall()
+    ''', (dimension,)).fetchall()
     db.close()
     return [dict(r) for r in rows]
 
 
+def get_status_breakdown():
+    return _breakdown('status')
+
+
 def get_level_breakdown():
+    return _breakdown('level')
+
+
+def get_trends_cube():
+    """The /api/trends/cube JSON text, encoded at refresh time
+    (see models.materialized.encode_trends_cube)."""
     db = get_db()
-    rows = db.execute('''
-        SELECT level, COUNT(*) as count
-        FROM policies
-        GROUP BY level
-        ORDER BY count DESC
-    ''').fetchall()
+    row = db.execute('SELECT body FROM trends_cube_encoded WHERE id = 1').fetchone()
     db.close()
-    return [dict(r) for r in rows]
+    return row['body'] if row else '{"dimensions":{},"columns":[],"rows":[]}'
 
 
 def get_all_topics():
@@ -185,15 +308,18 @@ def get_all_topics():
 
 
 def search_policies(query_text, limit=10):
+    terms = fts_terms(query_text)
+    if not terms:
+        return []
     db = get_db()
-    pattern = f'%{query_text}%'
     rows = db.execute('''
         SELECT p.*, s.name as state_name, s.code as state_code
-        FROM policies p
+        FROM policies_fts
+        JOIN policies p ON p.id = policies_fts.rowid
         LEFT JOIN states s ON p.state_id = s.id
-        WHERE p.title LIKE ? OR p.description LIKE ? OR p.summary_text LIKE ?
-        ORDER BY p.date_introduced DESC
+        WHERE policies_fts MATCH ?
+        ORDER BY bm25(policies_fts, ?, ?, ?), p.date_introduced DESC
         LIMIT ?
-    ''', (pattern, pattern, pattern, limit)).fetchall()
+    ''', (fts_match_expression(terms, 'AND'), *FTS_WEIGHTS, limit)).fetchall()
     db.close()
     return [dict(r) for r in rows]
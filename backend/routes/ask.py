@@ -1,65 +1,53 @@
-import time
-from flask import Blueprint, request
-from services.retrieval import retrieve_context, format_context
-from services.claude_service import ask_claude
+from flask import Blueprint, Response, request, stream_with_context
+from services.ask_service import answer, stream_answer
+from services.rate_limiter import check_rate_limit
 
 ask_bp = Blueprint('ask', __name__)
 
-# Simple in-memory rate limiting: max 10 requests per minute per IP
-_rate_limit = {}
-MAX_REQUESTS = 10
-WINDOW_SECONDS = 60
 
+def _read_question():
+    """Apply the rate limit and validate the body.
+    Returns (question, None) or (None, error_response)."""
+    allowed, retry_after = check_rate_limit(request.remote_addr)
+    if not allowed:
+        return None, ({'error': f'Rate limit exceeded. Please retry in {retry_after} seconds.'},
+                      429, {'Retry-After': str(retry_after)})
 
-def _check_rate_limit(ip):
-    now = time.time()
-    if ip not in _rate_limit:
-        _rate_limit[ip] = []
-    # Remove old timestamps
-    _rate_limit[ip] = [t for t in _rate_limit[ip] if now - t < WINDOW_SECONDS]
-    if len(_rate_limit[ip]) >= MAX_REQUESTS:
-        return False
-    _rate_limit[ip].append(now)
-    return True
+    data = request.get_json()
+    question = (data.get('question') or '').strip()
+    if not question:
+        return None, ({'error': 'Question is required'}, 400)
+    return question, None
 
 
 @ask_bp.route('/api/ask', methods=['POST'])
 def ask():
-    ip = request.remote_addr
-    if not _check_rate_limit(ip):
-        return {'error': 'Rate limit exceeded. Please wait a minute.'}, 429
+    if request.accept_mimetypes.best == 'text/event-stream':
+        return ask_stream()
 
-    data = request.get_json()
-    question = (data.get('question') or '').strip()
-    if not question:
-        return {'error': 'Question is required'}, 400
+    question, error = _read_question()
+    if error:
+        return error
 
     try:
-        # Retrieve relevant policies
-        policies = retrieve_context(question, limit=8)
-        context_text = format_context(policies)
+        return answer(question)
+    except Exception as e:
+        return {'error': str(e)}, 500
 
-        # Ask Claude
-        result = ask_claude(question, context_text)
 
-        # Build source list from retrieved policies
-        sources = []
-        for p in policies:
-            source = {
-                'id': p['id'],
-                'title': p['title'],
-                'state': p.get('state_name') or 'Federal',
-                'status': p['status'],
-            }
-            if p.get('source_url'):
-                source['url'] = p['source_url']
-            sources.append(source)
+@ask_bp.route('/api/ask/stream', methods=['POST'])
+def ask_stream():
+    """Server-Sent Events variant of /api/ask.
 
-        return {
-            'question': question,
-            'answer': result['answer'],
-            'sources': sources,
-            'model': result.get('model'),
-        }
-    except Exception as e:
-        return {'error': str(e)}, 500
+    Emits a 'sources' event right after retrieval, 'delta' events as answer
+    text arrives, then 'done' with the model and token usage ('error' on
+    failure).
+    """
+    question, error = _read_question()
+    if error:
+        return error
+
+    return Response(stream_with_context(stream_answer(question)), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no',
+    })
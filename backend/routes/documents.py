@@ -0,0 +1,15 @@
+from flask import Blueprint, request
+from routes.http_cache import cached_by_data_version
+from services.retrieval import retrieve_passages
+
+documents_bp = Blueprint('documents', __name__)
+
+
+@documents_bp.route('/api/documents/search')
+@cached_by_data_version
+def search_documents():
+    query = (request.args.get('q') or '').strip()
+    if not query:
+        return {'error': 'q is required'}, 400
+    limit = min(request.args.get('limit', 10, type=int), 50)
+    return retrieve_passages(query, limit=limit, state_code=request.args.get('state'))
@@ -0,0 +1,107 @@
+"""Bulk export of the policy corpus.
+
+NDJSON and CSV are generated while the response is sent, one fetchmany
+batch at a time (models.queries.iter_policies), so a full export uses the
+same memory as a small one. Parquet is not built per request: it serves the
+snapshot scripts/export_parquet.py writes to EXPORT_DIR, and only while that
+snapshot matches the current data version.
+"""
+
+import csv
+import glob
+import io
+import json
+import os
+import re
+
+from flask import Blueprint, Response, request, send_file, stream_with_context
+
+import config
+from models.queries import EXPORT_COLUMNS, iter_policies
+from routes.http_cache import cached_by_data_version, current_data_version
+
+export_bp = Blueprint('export', __name__)
+
+_SNAPSHOT_VERSION = re.compile(r'policies-v(\d+)\.parquet$')
+
+
+def _ndjson(batches):
+    for batch in batches:
+        lines = []
+        for row in batch:
+            record = dict(zip(EXPORT_COLUMNS, row))
+            record['topics'] = record['topics'].split('; ') if record['topics'] else []
+            lines.append(json.dumps(record))
+        yield '\n'.join(lines) + '\n'
+
+
+def _csv(batches):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_COLUMNS)
+    for batch in batches:
+        writer.writerows(batch)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue()  # header only: nothing matched
+
+
+FORMATS = {
+    'ndjson': (_ndjson, 'application/x-ndjson'),
+    'csv': (_csv, 'text/csv'),
+}
+
+
+def latest_snapshot():
+    """(path, data version) of the newest Parquet snapshot, or (None, None)."""
+    snapshots = []
+    for path in glob.glob(os.path.join(config.EXPORT_DIR, 'policies-v*.parquet')):
+        match = _SNAPSHOT_VERSION.search(path)
+        if match:
+            snapshots.append((int(match.group(1)), path))
+    if not snapshots:
+        return None, None
+    version, path = max(snapshots)
+    return path, version
+
+
+def _parquet():
+    if any(request.args.get(name) for name in ('level', 'status', 'topic_id', 'state')):
+        return {'error': 'The Parquet snapshot covers the whole corpus; filter it after loading'}, 400
+    path, version = latest_snapshot()
+    if path is None:
+        return {'error': 'No Parquet snapshot has been built (scripts/export_parquet.py)'}, 404
+    current, _ = current_data_version()
+    if version != current:
+        # Never serve an older snapshot under the current version's ETag
+        return {'error': f'The Parquet snapshot is for data version {version}, not {current}; '
+                         'rerun scripts/export_parquet.py'}, 409
+    response = send_file(path, mimetype='application/vnd.apache.parquet', as_attachment=True,
+                         download_name=os.path.basename(path), conditional=False)
+    response.headers['X-Data-Version'] = str(version)
+    return response
+
+
+@export_bp.route('/api/export')
+@cached_by_data_version
+def export_policies():
+    fmt = request.args.get('format', 'ndjson')
+    if fmt == 'parquet':
+        return _parquet()
+    if fmt not in FORMATS:
+        return {'error': 'format must be ndjson, csv or parquet'}, 400
+
+    render, mimetype = FORMATS[fmt]
+    batches = iter_policies(
+        level=request.args.get('level'),
+        status=request.args.get('status'),
+        topic_id=request.args.get('topic_id', type=int),
+        state_code=request.args.get('state'),
+    )
+    version, _ = current_data_version()
+    return Response(stream_with_context(render(batches)), mimetype=mimetype, headers={
+        'Content-Disposition': f'attachment; filename=statescope-policies-v{version}.{fmt}',
+        'X-Data-Version': str(version),
+    })
@@ -0,0 +1,63 @@
+"""Conditional GET support for read endpoints.
+
+Responses only change when an ingestion script bumps the data version, so
+every read view derives a strong ETag from (data version, URL). Matching
+If-None-Match / If-Modified-Since requests get a 304 without running the
+view. The version itself is re-read from SQLite at most every
+DATA_VERSION_TTL seconds per worker.
+"""
+
+import hashlib
+import threading
+import time
+from datetime import datetime, timezone
+from functools import wraps
+
+from flask import make_response, request
+
+import config
+from models.queries import get_data_version
+
+_lock = threading.Lock()
+_state = {'version': None, 'updated_at': 0, 'checked': float('-inf')}
+
+
+def current_data_version():
+    """Return the (version, updated_at) pair, refreshed at most every TTL."""
+    now = time.monotonic()
+    with _lock:
+        if now - _state['checked'] < config.DATA_VERSION_TTL:
+            return _state['version'], _state['updated_at']
+    version, updated_at = get_data_version()
+    with _lock:
+        _state.update(version=version, updated_at=updated_at, checked=now)
+    return version, updated_at
+
+
+def cached_by_data_version(view):
+    """Add ETag / Last-Modified / Cache-Control and answer revalidations with 304."""
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        version, updated_at = current_data_version()
+        etag = hashlib.sha1(f'{version}:{request.full_path}'.encode()).hexdigest()
+        last_modified = datetime.fromtimestamp(updated_at, timezone.utc)
+
+        if request.if_none_match:
+            not_modified = request.if_none_match.contains(etag)
+        else:
+            since = request.if_modified_since
+            not_modified = since is not None and last_modified <= since
+
+        if not_modified:
+            response = make_response('', 304)
+        else:
+            response = make_response(view(*args, **kwargs))
+            if response.status_code != 200:
+                return response
+
+        response.set_etag(etag)
+        response.last_modified = last_modified
+        response.cache_control.public = True
+        response.cache_control.max_age = config.HTTP_CACHE_MAX_AGE
+        return response
+    return wrapper
@@ -1,20 +1,35 @@
 from flask import Blueprint, request
-from models.queries import get_all_policies, get_policy_by_id, get_all_topics
+from models.queries import get_all_policies, get_policies_page, get_policy_by_id, get_all_topics
+from routes.http_cache import cached_by_data_version
 
 policies_bp = Blueprint('policies', __name__)
 
 
 @policies_bp.route('/api/policies')
+@cached_by_data_version
 def list_policies():
     level = request.args.get('level')
     status = request.args.get('status')
     topic_id = request.args.get('topic_id', type=int)
     limit = request.args.get('limit', 50, type=int)
+
+    # Keyset pagination: pass cursor= (empty for the first page), then next_cursor
+    if 'cursor' in request.args:
+        if limit < 1:
+            return {'error': 'limit must be at least 1'}, 400
+        try:
+            policies, next_cursor = get_policies_page(level=level, status=status, topic_id=topic_id,
+                                                      limit=limit, cursor=request.args['cursor'])
+        except ValueError as e:
+            return {'error': str(e)}, 400
+        return {'policies': policies, 'next_cursor': next_cursor}
+
     offset = request.args.get('offset', 0, type=int)
     return get_all_policies(level=level, status=status, topic_id=topic_id, limit=limit, offset=offset)
 
 
 @policies_bp.route('/api/policies/<int:policy_id>')
+@cached_by_data_version
 def policy_detail(policy_id):
     policy = get_policy_by_id(policy_id)
     if not policy:
@@ -23,5 +38,6 @@ def policy_detail(policy_id):
 
 
 @policies_bp.route('/api/topics')
+@cached_by_data_version
 def list_topics():
     return get_all_topics()
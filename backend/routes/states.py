@@ -1,14 +1,17 @@
 from flask import Blueprint
 from models.queries import get_all_states, get_state_policies
+from routes.http_cache import cached_by_data_version
 
 states_bp = Blueprint('states', __name__)
 
 
 @states_bp.route('/api/states')
+@cached_by_data_version
 def list_states():
     return get_all_states()
 
 
 @states_bp.route('/api/states/<code>/policies')
+@cached_by_data_version
 def state_policies(code):
     return get_state_policies(code)
@@ -1,10 +1,12 @@
-from flask import Blueprint, request
-from models.queries import get_timeline_data, get_topic_counts, get_status_breakdown, get_level_breakdown
+from flask import Blueprint, Response, request
+from models.queries import get_timeline_data, get_topic_counts, get_status_breakdown, get_level_breakdown, get_trends_cube
+from routes.http_cache import cached_by_data_version
 
 trends_bp = Blueprint('trends', __name__)
 
 
 @trends_bp.route('/api/trends/timeline')
+@cached_by_data_version
 def timeline():
     state = request.args.get('state')
     topic_id = request.args.get('topic_id', type=int)
@@ -13,6 +15,7 @@ def timeline():
 
 
 @trends_bp.route('/api/trends/topics')
+@cached_by_data_version
 def topics():
     state = request.args.get('state')
     policy_type = request.args.get('policy_type')
@@ -20,10 +23,18 @@ def topics():
 
 
 @trends_bp.route('/api/trends/status')
+@cached_by_data_version
 def status():
     return get_status_breakdown()
 
 
 @trends_bp.route('/api/trends/level')
+@cached_by_data_version
 def level():
     return get_level_breakdown()
+
+
+@trends_bp.route('/api/trends/cube')
+@cached_by_data_version
+def cube():
+    return Response(get_trends_cube(), mimetype='application/json')
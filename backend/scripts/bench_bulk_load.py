@@ -0,0 +1,50 @@
+"""Benchmark the bulk policy loader against a scratch database.
+
+Usage:
+    cd backend
+    python scripts/bench_bulk_load.py [--count 100000] [--seed 42]
+
+Builds a fresh database from docs/schema.sql in a temp directory, loads
+--count synthetic policies with models.ingest.bulk_upsert_policies, then
+re-upserts the same set to time the update path.
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+# Add parent dir to path so we can import models
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from models.ingest import bulk_upsert_policies
+from models.materialized import refresh_materialized
+from scripts.generate_synthetic import create_scratch_db, synthetic_policies
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark bulk policy loading')
+    parser.add_argument('--count', type=int, default=100_000)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db = create_scratch_db(os.path.join(tmp, 'bench.db'))
+        state_map = {r['code']: r['id'] for r in db.execute('SELECT id, code FROM states')}
+        topic_map = {r['name']: r['id'] for r in db.execute('SELECT id, name FROM topics')}
+        policies = list(synthetic_policies(args.count, list(state_map), list(topic_map), args.seed))
+
+        for label in ('insert', 'update'):
+            start = time.perf_counter()
+            ids, new_count = bulk_upsert_policies(db, policies, state_map, topic_map)
+            refresh_materialized(db)
+            db.commit()
+            elapsed = time.perf_counter() - start
+            print(f'{label:>6}: {len(ids):,} policies ({new_count:,} new) in {elapsed:.2f}s '
+                  f'({len(ids) / elapsed:,.0f}/s)')
+        db.close()
+
+
+if __name__ == '__main__':
+    main()
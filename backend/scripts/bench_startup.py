@@ -0,0 +1,140 @@
+"""Cold-start benchmark: import time and boot-to-first-request.
+
+Usage:
+    cd backend
+    python scripts/bench_startup.py [--runs 10]
+    python scripts/bench_startup.py --save-baseline benchmarks/startup.json
+    python scripts/bench_startup.py --baseline benchmarks/startup.json
+
+Every sample is a fresh interpreter, as on a scale-from-zero start or a
+worker restart:
+  import app / import asgi   time to import the application module
+  boot                       uvicorn spawn until the first /api/states 200
+  first request              latency of that first /api/states request
+Also reports which heavy modules were loaded by the import. With
+--baseline, any case whose p50 exceeds the baseline by more than
+--tolerance is flagged and the script exits non-zero.
+"""
+
+import argparse
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+HEAVY_MODULES = ('anthropic', 'httpx', 'numpy', 'services.congress_service')
+BOOT_TIMEOUT = 30
+
+_IMPORT_PROBE = '''
+import json, sys, time
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+print(json.dumps({{'seconds': elapsed, 'loaded': [m for m in {heavy!r} if m in sys.modules]}}))
+'''
+
+
+def time_import(module):
+    """(seconds, heavy modules loaded) for importing module in a new interpreter."""
+    out = subprocess.run([sys.executable, '-c', _IMPORT_PROBE.format(module=module, heavy=HEAVY_MODULES)],
+                         cwd=BACKEND_DIR, capture_output=True, text=True, check=True).stdout
+    result = json.loads(out.strip().splitlines()[-1])
+    return result['seconds'], result['loaded']
+
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def time_boot():
+    """(boot seconds, first request seconds) for a uvicorn worker serving asgi:app."""
+    port = _free_port()
+    url = f'http://127.0.0.1:{port}/api/states'
+    start = time.perf_counter()
+    proc = subprocess.Popen([sys.executable, '-m', 'uvicorn', '--app-dir', BACKEND_DIR, '--port', str(port),
+                             '--log-level', 'warning', 'asgi:app'],
+                            cwd=BACKEND_DIR, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        while time.perf_counter() - start < BOOT_TIMEOUT:
+            if proc.poll() is not None:
+                raise RuntimeError('uvicorn exited during startup')
+            request_start = time.perf_counter()
+            try:
+                with urllib.request.urlopen(url, timeout=BOOT_TIMEOUT) as resp:
+                    resp.read()
+            except (urllib.error.URLError, ConnectionError):
+                time.sleep(0.005)
+                continue
+            done = time.perf_counter()
+            return done - start, done - request_start
+        raise RuntimeError(f'no response within {BOOT_TIMEOUT}s')
+    finally:
+        proc.terminate()
+        proc.wait()
+
+
+def summarize(samples):
+    return {
+        'p50': round(statistics.median(samples) * 1000, 2),
+        'max': round(max(samples) * 1000, 2),
+        'runs': len(samples),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark import and boot time')
+    parser.add_argument('--runs', type=int, default=10)
+    parser.add_argument('--baseline', help='Compare against this baseline JSON')
+    parser.add_argument('--save-baseline', help='Write results to this baseline JSON')
+    parser.add_argument('--tolerance', type=float, default=1.25, help='Allowed p50 ratio vs baseline')
+    args = parser.parse_args()
+
+    samples = {'import app': [], 'import asgi': [], 'boot': [], 'first request': []}
+    loaded = {}
+    for _ in range(args.runs):
+        for module in ('app', 'asgi'):
+            seconds, loaded[module] = time_import(module)
+            samples[f'import {module}'].append(seconds)
+        boot, first = time_boot()
+        samples['boot'].append(boot)
+        samples['first request'].append(first)
+
+    results = {name: summarize(values) for name, values in samples.items()}
+    print(f'{"case":<16}{"p50 ms":>10}{"max ms":>10}')
+    for name, stats in results.items():
+        print(f'{name:<16}{stats["p50"]:>10.1f}{stats["max"]:>10.1f}')
+    for module, modules in loaded.items():
+        print(f'import {module} loads: {", ".join(modules) or "no heavy modules"}')
+
+    if args.save_baseline:
+        os.makedirs(os.path.dirname(os.path.abspath(args.save_baseline)), exist_ok=True)
+        with open(args.save_baseline, 'w') as f:
+            json.dump({'runs': args.runs, 'results': results}, f, indent=2)
+        print(f'\nBaseline written to {args.save_baseline}')
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = []
+        for name, stats in results.items():
+            base = baseline.get('results', {}).get(name)
+            if base and stats['p50'] > base['p50'] * args.tolerance:
+                regressions.append((name, base['p50'], stats['p50']))
+        if regressions:
+            print(f'\nRegressions (p50 more than {args.tolerance:.2f}x baseline):')
+            for name, before, after in regressions:
+                print(f'  {name}: {before:.1f} ms -> {after:.1f} ms')
+            sys.exit(1)
+        print('\nNo regressions against baseline.')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,189 @@
+"""Latency benchmarks for models.queries, retrieval and every Flask route.
+
+Usage:
+    cd backend
+    python scripts/benchmark.py --scale 100000            # generate (or reuse) a synthetic DB
+    python scripts/benchmark.py --db path/to/db --iterations 200
+    python scripts/benchmark.py --scale 100000 --save-baseline benchmarks/baseline_100k.json
+    python scripts/benchmark.py --scale 100000 --baseline benchmarks/baseline_100k.json
+
+Reports p50/p95/p99 per case in milliseconds. With --baseline, any case
+whose p95 exceeds the baseline by more than --tolerance is flagged and the
+script exits non-zero, so it can gate a deploy.
+"""
+
+import argparse
+import json
+import os
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+
+# Add parent dir to path so we can import app/models/services
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import config
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    k = (len(ordered) - 1) * pct / 100
+    lo, hi = int(k), min(int(k) + 1, len(ordered) - 1)
+    return ordered[lo] + (ordered[hi] - ordered[lo]) * (k - lo)
+
+
+def query_cases():
+    from models import queries
+    from services.retrieval import retrieve_context
+
+    return {
+        'get_all_states': lambda: queries.get_all_states(),
+        'get_state_policies': lambda: queries.get_state_policies('CA'),
+        'get_all_policies': lambda: queries.get_all_policies(limit=50),
+        'get_all_policies_deep_offset': lambda: queries.get_all_policies(limit=50, offset=5000),
+        'get_all_policies_filtered': lambda: queries.get_all_policies(level='state', status='enacted', topic_id=1),
+        'get_policies_page': lambda: queries.get_policies_page(limit=50, cursor=''),
+        'get_policy_by_id': lambda: queries.get_policy_by_id(1),
+        'get_timeline_data': lambda: queries.get_timeline_data(),
+        'get_timeline_data_filtered': lambda: queries.get_timeline_data(state_code='CA', topic_id=1, policy_type='bill'),
+        'get_topic_counts': lambda: queries.get_topic_counts(),
+        'get_topic_counts_filtered': lambda: queries.get_topic_counts(state_code='TX', policy_type='bill'),
+        'get_status_breakdown': lambda: queries.get_status_breakdown(),
+        'get_level_breakdown': lambda: queries.get_level_breakdown(),
+        'get_trends_cube': lambda: queries.get_trends_cube(),
+        'get_all_topics': lambda: queries.get_all_topics(),
+        'search_policies': lambda: queries.search_policies('student data privacy'),
+        'retrieve_context': lambda: retrieve_context('How are states handling generative AI in classrooms?', limit=8),
+    }
+
+
+def route_cases(client):
+    counter = iter(range(10 ** 9))
+
+    def ask():
+        # A distinct client address per call keeps the per-IP rate limit out of the numbers
+        i = next(counter)
+        return client.post('/api/ask', json={'question': 'What are states doing about AI literacy?'},
+                           environ_base={'REMOTE_ADDR': f'10.{i >> 16 & 255}.{i >> 8 & 255}.{i & 255}'})
+
+    cases = {
+        'GET /api/health': lambda: client.get('/api/health'),
+        'GET /api/states': lambda: client.get('/api/states'),
+        'GET /api/states/<code>/policies': lambda: client.get('/api/states/CA/policies'),
+        'GET /api/policies': lambda: client.get('/api/policies?limit=50'),
+        'GET /api/policies?cursor': lambda: client.get('/api/policies?limit=50&cursor='),
+        'GET /api/policies/<id>': lambda: client.get('/api/policies/1'),
+        'GET /api/topics': lambda: client.get('/api/topics'),
+        'GET /api/trends/timeline': lambda: client.get('/api/trends/timeline?state=CA'),
+        'GET /api/trends/topics': lambda: client.get('/api/trends/topics'),
+        'GET /api/trends/status': lambda: client.get('/api/trends/status'),
+        'GET /api/trends/level': lambda: client.get('/api/trends/level'),
+        'GET /api/trends/cube': lambda: client.get('/api/trends/cube'),
+        'POST /api/ask': ask,
+    }
+    return cases
+
+
+def run_case(fn, iterations, warmup):
+    for _ in range(warmup):
+        fn()
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        result = fn()
+        samples.append((time.perf_counter() - start) * 1000)
+        status = getattr(result, 'status_code', 200)
+        if status >= 500:
+            raise RuntimeError(f'HTTP {status}')
+    return {
+        'p50': percentile(samples, 50),
+        'p95': percentile(samples, 95),
+        'p99': percentile(samples, 99),
+        'mean': statistics.fmean(samples),
+    }
+
+
+def compare(results, baseline, tolerance):
+    regressions = []
+    for name, stats in results.items():
+        base = baseline.get('results', {}).get(name)
+        if base and stats['p95'] > base['p95'] * tolerance:
+            regressions.append((name, base['p95'], stats['p95']))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark queries and routes')
+    parser.add_argument('--db', help='Database to benchmark (default: synthetic DB for --scale)')
+    parser.add_argument('--scale', type=int, default=10_000, help='Synthetic corpus size when --db is not given')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--iterations', type=int, default=100)
+    parser.add_argument('--warmup', type=int, default=5)
+    parser.add_argument('--baseline', help='Compare against this baseline JSON')
+    parser.add_argument('--save-baseline', help='Write results to this baseline JSON')
+    parser.add_argument('--tolerance', type=float, default=1.25, help='Allowed p95 ratio vs baseline')
+    args = parser.parse_args()
+
+    db_path = args.db
+    if not db_path:
+        from scripts.generate_synthetic import generate
+        db_path = os.path.join(tempfile.gettempdir(), f'statescope_{args.scale}_{args.seed}.db')
+        if not os.path.exists(db_path):
+            print(f'Generating {args.scale:,} synthetic policies at {db_path}...')
+            generate(db_path, args.scale, args.seed)
+
+    # Point the app at the scratch DB; never call Claude or touch the real answer cache / rate limits
+    scratch = tempfile.mkdtemp()
+    config.DATABASE_PATH = os.path.abspath(db_path)
+    config.ANTHROPIC_API_KEY = ''
+    config.ANSWER_CACHE_PATH = os.path.join(scratch, 'answer_cache.db')
+    config.RATE_LIMIT_PATH = os.path.join(scratch, 'rate_limit.db')
+    config.VECTOR_INDEX_DIR = f'{os.path.abspath(db_path)}.vectors'
+    try:
+        from services import vector_index
+        db = sqlite3.connect(config.DATABASE_PATH)
+        vector_index.build(db)  # no-op when the DB is unchanged since the last run
+        db.close()
+    except ImportError:
+        print('numpy not installed; retrieval benchmarks are keyword-only')
+
+    from app import app
+    client = app.test_client()
+
+    cases = {**query_cases(), **route_cases(client)}
+    results = {}
+    print(f'{"case":<36} {"p50":>9} {"p95":>9} {"p99":>9}   (ms, n={args.iterations})')
+    for name, fn in cases.items():
+        stats = run_case(fn, args.iterations, args.warmup)
+        results[name] = stats
+        print(f'{name:<36} {stats["p50"]:>9.2f} {stats["p95"]:>9.2f} {stats["p99"]:>9.2f}')
+
+    report = {
+        'db': db_path,
+        'scale': args.scale if not args.db else None,
+        'iterations': args.iterations,
+        'results': results,
+    }
+
+    if args.save_baseline:
+        os.makedirs(os.path.dirname(os.path.abspath(args.save_baseline)), exist_ok=True)
+        with open(args.save_baseline, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f'\nBaseline written to {args.save_baseline}')
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.tolerance)
+        if regressions:
+            print(f'\nRegressions (p95 more than {args.tolerance:.2f}x baseline):')
+            for name, before, after in regressions:
+                print(f'  {name}: {before:.2f}ms -> {after:.2f}ms')
+            sys.exit(1)
+        print('\nNo regressions against baseline.')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,125 @@
+"""Build the deployable database artifact in one step.
+
+Usage:
+    cd backend
+    python scripts/build_db.py [--out PATH] [--vectors DIR]
+
+Runs init_db and seed_data against a scratch file, then prepares it for a
+cold start: the FTS indexes are merged, ANALYZE statistics are collected,
+the file is VACUUMed into contiguous pages and its WAL is checkpointed
+away. The result is a single file, already in WAL mode, that replaces
+--out (default: the app's database) atomically. Stop any server using
+--out first, since its -wal/-shm files are removed with the old database.
+
+The semantic vector index is built for the same database and swapped in
+with it: into the app's VECTOR_INDEX_DIR when --out is the app's database,
+otherwise into <out>.vectors, which ships with the artifact (point
+VECTOR_INDEX_DIR at it where the artifact is deployed).
+
+The data version continues from the database being replaced, so ETags and
+cached answers from an earlier build never match this one's.
+"""
+
+import argparse
+import os
+import shutil
+import sqlite3
+import sys
+import time
+
+# Add parent dir to path so we can import models
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import config
+from scripts.init_db import init_db
+from scripts.seed_data import seed
+
+FTS_TABLES = ('policies_fts', 'document_chunks_fts')
+
+
+def _remove(path):
+    for suffix in ('', '-wal', '-shm', '-journal'):
+        if os.path.exists(path + suffix):
+            os.remove(path + suffix)
+
+
+def _default_vectors(out):
+    if out == os.path.abspath(config.DATABASE_PATH):
+        return config.VECTOR_INDEX_DIR
+    return f'{out}.vectors'
+
+
+def _data_version(path):
+    """The data version recorded in path, or 0 if there is no readable one."""
+    if not os.path.exists(path):
+        return 0
+    try:
+        db = sqlite3.connect(f'file:{path}?mode=ro', uri=True)
+        try:
+            row = db.execute('SELECT version FROM data_version WHERE id = 1').fetchone()
+        finally:
+            db.close()
+    except sqlite3.Error:
+        return 0
+    return row[0] if row else 0
+
+
+def carry_data_version(path, previous):
+    """Move path's data version past both its own and the previous build's; returns it."""
+    db = sqlite3.connect(path)
+    db.execute('''
+        UPDATE data_version
+        SET version = MAX(version, ?) + 1,
+            updated_at = CAST(strftime('%s', 'now') AS INTEGER)
+        WHERE id = 1
+    ''', (previous,))
+    db.commit()
+    version = db.execute('SELECT version FROM data_version WHERE id = 1').fetchone()[0]
+    db.close()
+    return version
+
+
+def compact(path):
+    """Optimize FTS, ANALYZE and VACUUM path, leaving a single WAL-mode file."""
+    db = sqlite3.connect(path)
+    for table in FTS_TABLES:
+        db.execute(f"INSERT INTO {table} ({table}) VALUES ('optimize')")
+    db.execute('ANALYZE')
+    db.commit()
+    db.execute('VACUUM')
+    result = [row[0] for row in db.execute('PRAGMA integrity_check')]
+    if result != ['ok']:
+        raise RuntimeError(f'integrity check failed: {result[:5]}')
+    db.execute('PRAGMA journal_mode = WAL')
+    db.close()  # closing the last connection checkpoints and deletes the -wal file
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Build a prebuilt, VACUUMed database')
+    parser.add_argument('--out', default=config.DATABASE_PATH)
+    parser.add_argument('--vectors', help='Vector index directory (default: see module docstring)')
+    args = parser.parse_args()
+
+    out = os.path.abspath(args.out)
+    vectors = os.path.abspath(args.vectors or _default_vectors(out))
+    scratch = f'{out}.build'
+    scratch_vectors = f'{scratch}.vectors'
+    start = time.perf_counter()
+    _remove(scratch)
+    shutil.rmtree(scratch_vectors, ignore_errors=True)
+    init_db(scratch)
+    seed(scratch, scratch_vectors)
+    version = carry_data_version(scratch, _data_version(out))
+    compact(scratch)
+
+    _remove(out)
+    os.replace(scratch, out)
+    if os.path.isdir(scratch_vectors):
+        shutil.rmtree(vectors, ignore_errors=True)
+        os.replace(scratch_vectors, vectors)
+    print(f'\nBuilt {out} v{version} ({os.path.getsize(out) / 1e6:.1f} MB) '
+          f'in {time.perf_counter() - start:.1f}s')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,51 @@
+"""Build or update the semantic vector index used by /api/ask retrieval.
+
+Usage:
+    cd backend
+    python scripts/build_vector_index.py [--full] [--db PATH] [--out DIR]
+
+Only policies whose text changed since the last build are re-embedded;
+--full recomputes IDF weights and every vector. Requires numpy.
+"""
+
+import argparse
+import os
+import sqlite3
+import sys
+import time
+
+# Add parent dir to path so we can import models/services
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import config
+from services import vector_index
+
+
+def update_vector_index(db, index_dir=None):
+    """Incrementally refresh the index (default: the app's) after an ingest; skipped without numpy."""
+    try:
+        stats = vector_index.build(db, index_dir)
+    except ImportError:
+        print('numpy not installed; skipping vector index (keyword retrieval only)')
+        return
+    print(f"Vector index: {stats['embedded']} of {stats['policies']} policies embedded")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Build the policy vector index')
+    parser.add_argument('--full', action='store_true', help='Re-embed everything with fresh IDF weights')
+    parser.add_argument('--db', default=config.DATABASE_PATH)
+    parser.add_argument('--out', default=config.VECTOR_INDEX_DIR)
+    args = parser.parse_args()
+
+    db = sqlite3.connect(args.db)
+    start = time.perf_counter()
+    stats = vector_index.build(db, args.out, full=args.full)
+    db.close()
+    kind = 'full' if stats['full'] else 'incremental'
+    print(f"{kind} build {stats['build']}: {stats['embedded']:,} of {stats['policies']:,} policies "
+          f"embedded in {time.perf_counter() - start:.2f}s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,73 @@
+"""Write a Parquet snapshot of the policy corpus for /api/export?format=parquet.
+
+Usage:
+    cd backend
+    python scripts/export_parquet.py [--db PATH] [--out DIR]
+
+Writes EXPORT_DIR/policies-v<data version>.parquet one row group per
+fetchmany batch, so memory stays flat for any corpus size, and removes
+older snapshots. Run it after ingesting. Requires `pip install pyarrow`.
+"""
+
+import argparse
+import glob
+import os
+import sys
+import time
+
+# Add parent dir to path so we can import models
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import config
+from models.queries import EXPORT_COLUMNS, get_data_version, iter_policies
+
+ROW_GROUP_SIZE = 10000
+
+
+def export_parquet(out_dir):
+    """Write the snapshot for the current data version; returns (path, rows)."""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    fields = [pa.field('id', pa.int64())]
+    fields += [pa.field(name, pa.string()) for name in EXPORT_COLUMNS[1:-1]]
+    fields.append(pa.field('topics', pa.list_(pa.string())))
+    schema = pa.schema(fields)
+
+    version, _ = get_data_version()
+    os.makedirs(out_dir, exist_ok=True)
+    path = os.path.join(out_dir, f'policies-v{version}.parquet')
+    tmp_path = f'{path}.tmp'
+    rows = 0
+    with pq.ParquetWriter(tmp_path, schema, compression='zstd') as writer:
+        for batch in iter_policies(batch_size=ROW_GROUP_SIZE):
+            columns = [list(col) for col in zip(*batch)]
+            columns[-1] = [topics.split('; ') if topics else [] for topics in columns[-1]]
+            writer.write_batch(pa.record_batch(columns, schema=schema))
+            rows += len(batch)
+    os.replace(tmp_path, path)
+
+    for old in glob.glob(os.path.join(out_dir, 'policies-v*.parquet')):
+        if old != path:
+            os.remove(old)
+    return path, rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Write a Parquet snapshot of all policies')
+    parser.add_argument('--db', default=config.DATABASE_PATH)
+    parser.add_argument('--out', default=config.EXPORT_DIR)
+    args = parser.parse_args()
+
+    config.DATABASE_PATH = os.path.abspath(args.db)
+    start = time.perf_counter()
+    try:
+        path, rows = export_parquet(args.out)
+    except ImportError:
+        sys.exit('pyarrow is not installed: pip install pyarrow')
+    print(f'Wrote {rows:,} policies to {path} ({os.path.getsize(path) / 1e6:.1f} MB) '
+          f'in {time.perf_counter() - start:.2f}s')
+
+
+if __name__ == '__main__':
+    main()
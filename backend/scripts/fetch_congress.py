@@ -3,11 +3,17 @@
 Usage:
     cd backend
     source venv/bin/activate
-    python scripts/fetch_congress.py
+    python scripts/fetch_congress.py [--full] [--cache off|on|replay|offline]
+
+By default only bills whose updateDate / latestAction changed since the
+last run (tracked in the congress_sync table) are refetched and rewritten.
+Pass --full to refetch every bill. --cache replays API responses from the
+on-disk cache in data/cache/congress (--cache offline needs no API key).
 
 Requires CONGRESS_API_KEY in .env (get one free at https://api.data.gov/signup/)
 """
 
+import argparse
 import json
 import os
 import sqlite3
@@ -17,102 +23,49 @@ import sys
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 
 import config
-from services.congress_service import fetch_all_bills
+from models.ingest import bulk_upsert_policies
+from models.materialized import refresh_materialized
+from scripts.build_vector_index import update_vector_index
+from services.congress_service import fetch_all_bills, sync_bills
+from services.response_cache import MODES as CACHE_MODES
 
 DATA_DIR = os.path.join(os.path.dirname(__file__), '..', 'data')
 DB_PATH = config.DATABASE_PATH
 
-# Topic keyword mapping: map bill subjects/title keywords to our topic IDs
-TOPIC_KEYWORDS = {
-    'AI Literacy': ['literacy', 'literate'],
-    'Student Privacy': ['privacy', 'student data', 'ferpa'],
-    'Teacher Training': ['teacher', 'educator', 'professional development', 'training'],
-    'Curriculum': ['curriculum', 'standards', 'course'],
-    'Assessment': ['assessment', 'testing', 'evaluation'],
-    'Procurement': ['procurement', 'vendor', 'purchasing'],
-    'Task Forces': ['task force', 'commission', 'committee', 'study', 'advisory'],
-    'Academic Integrity': ['integrity', 'cheating', 'plagiarism'],
-    'Equity & Access': ['equity', 'access', 'underserved', 'disadvantaged', 'digital divide'],
-    'Data Governance': ['data governance', 'data management', 'transparency'],
-    'Workforce Development': ['workforce', 'career', 'job', 'employment'],
-    'Research': ['research', 'study', 'grant', 'fund'],
-}
-
-
-def match_topics(bill):
-    """Match a bill to topic names based on title, summary, and subjects."""
-    searchable = ' '.join([
-        bill.get('title', ''),
-        bill.get('summary_text', '') or '',
-        bill.get('description', ''),
-        ' '.join(bill.get('subjects', [])),
-    ]).lower()
-
-    matched = []
-    for topic_name, keywords in TOPIC_KEYWORDS.items():
-        if any(kw in searchable for kw in keywords):
-            matched.append(topic_name)
-
-    return matched if matched else ['Research']  # Default fallback
-
-
-def upsert_bill(db, bill, topic_map):
-    """Insert or update a bill in the database. Returns (policy_id, was_new)."""
-    # Check if bill already exists by bill_number
-    existing = db.execute(
-        'SELECT id FROM policies WHERE bill_number = ? AND level = ?',
-        (bill['bill_number'], 'federal')
-    ).fetchone()
-
-    if existing:
-        policy_id = existing[0]
-        db.execute('''
-            UPDATE policies SET
-                title = ?, description = ?, status = ?,
-                date_introduced = ?, date_enacted = ?,
-                sponsor = ?, summary_text = ?, source_url = ?
-            WHERE id = ?
-        ''', (
-            bill['title'], bill['description'], bill['status'],
-            bill['date_introduced'], bill.get('date_enacted'),
-            bill.get('sponsor'), bill.get('summary_text'), bill.get('source_url'),
-            policy_id,
-        ))
-        # Clear old topic links
-        db.execute('DELETE FROM policy_topics WHERE policy_id = ?', (policy_id,))
-        was_new = False
-    else:
-        cursor = db.execute('''
-            INSERT INTO policies
-            (state_id, title, description, policy_type, level, status,
-             date_introduced, date_enacted, bill_number, sponsor, summary_text, source_url)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        ''', (
-            None,  # federal bills have no state
-            bill['title'], bill['description'], bill['policy_type'],
-            bill['level'], bill['status'],
-            bill['date_introduced'], bill.get('date_enacted'),
-            bill['bill_number'], bill.get('sponsor'),
-            bill.get('summary_text'), bill.get('source_url'),
-        ))
-        policy_id = cursor.lastrowid
-        was_new = True
-
-    # Link topics
-    topics = match_topics(bill)
-    for topic_name in topics:
-        topic_id = topic_map.get(topic_name)
-        if topic_id:
-            db.execute(
-                'INSERT OR IGNORE INTO policy_topics (policy_id, topic_id) VALUES (?, ?)',
-                (policy_id, topic_id)
-            )
-
-    return policy_id, was_new
+def load_sync_state(db):
+    """Return {bill_key: (update_date, latest_action)} for bills still in the DB."""
+    rows = db.execute('''
+        SELECT cs.bill_key, cs.update_date, cs.latest_action
+        FROM congress_sync cs
+        JOIN policies p ON p.id = cs.policy_id
+    ''').fetchall()
+    return {r['bill_key']: (r['update_date'], r['latest_action']) for r in rows}
+
+
+def record_sync(db, bills, policy_ids):
+    """Remember the cursor each bill was synced at."""
+    db.executemany('''
+        INSERT INTO congress_sync (bill_key, policy_id, update_date, latest_action, subjects, synced_at)
+        VALUES (?, ?, ?, ?, ?, datetime('now'))
+        ON CONFLICT(bill_key) DO UPDATE SET
+            policy_id = excluded.policy_id,
+            update_date = excluded.update_date,
+            latest_action = excluded.latest_action,
+            subjects = excluded.subjects,
+            synced_at = excluded.synced_at
+    ''', [(b['bill_key'], policy_id, b['update_date'], b['latest_action'], json.dumps(b.get('subjects', [])))
+          for b, policy_id in zip(bills, policy_ids)])
 
 
 def main():
-    if not config.CONGRESS_API_KEY:
+    parser = argparse.ArgumentParser(description='Fetch federal bills from Congress.gov')
+    parser.add_argument('--full', action='store_true',
+                        help='Refetch every bill instead of only those changed since the last sync')
+    parser.add_argument('--cache', choices=CACHE_MODES, default=config.CONGRESS_CACHE_MODE,
+                        help='On-disk API response cache mode (default: %(default)s)')
+    args = parser.parse_args()
+
+    if not config.CONGRESS_API_KEY and args.cache != 'offline':
         print('Error: CONGRESS_API_KEY not set in .env')
         print('Get a free key at https://api.data.gov/signup/')
         sys.exit(1)
@@ -122,35 +75,49 @@ def main():
         data = json.load(f)
     bill_list = data['bills']
 
-    print(f'Fetching {len(bill_list)} bills from Congress.gov API...\n')
-    bills = fetch_all_bills(bill_list)
-    print(f'\nFetched {len(bills)} bills successfully.\n')
-
     # Open database
     db = sqlite3.connect(DB_PATH)
     db.row_factory = sqlite3.Row
 
+    unchanged = []
+    if args.full:
+        print(f'Fetching {len(bill_list)} bills from Congress.gov API...\n')
+        bills, failed = fetch_all_bills(bill_list, cache_mode=args.cache)
+        print(f'\nFetched {len(bills)} bills successfully, {len(failed)} failed.\n')
+    else:
+        print(f'Checking {len(bill_list)} bills for changes on Congress.gov...\n')
+        bills, unchanged, failed = sync_bills(bill_list, load_sync_state(db), cache_mode=args.cache)
+        print(f'\n{len(bills)} changed, {len(unchanged)} unchanged (skipped), {len(failed)} failed.\n')
+    # Failed bills keep their stored row and sync cursor, so the next run retries them
+    for key in failed:
+        print(f'  FAILED {key}')
+
     # Build topic lookup
     topic_map = {}
     for row in db.execute('SELECT id, name FROM topics').fetchall():
         topic_map[row['name']] = row['id']
 
-    new_count = 0
-    updated_count = 0
+    # Federal bills have no state; with no curated topics, bulk_upsert_policies
+    # tags them with the shared keyword classifier (title, summary, subjects)
+    for bill in bills:
+        bill['state'] = None
 
+    policy_ids, new_count = bulk_upsert_policies(db, bills, {}, topic_map)
+    updated_count = len(policy_ids) - new_count
+    record_sync(db, bills, policy_ids)
     for bill in bills:
-        policy_id, was_new = upsert_bill(db, bill, topic_map)
-        if was_new:
-            new_count += 1
-            print(f'  NEW: {bill["bill_number"]} - {bill["title"][:60]}')
-        else:
-            updated_count += 1
-            print(f'  UPDATED: {bill["bill_number"]} - {bill["title"][:60]}')
+        print(f'  {bill["bill_number"]} - {bill["title"][:60]}')
 
+    if bills:
+        refresh_materialized(db)
     db.commit()
+    if bills:
+        update_vector_index(db)
     db.close()
 
-    print(f'\nDone! {new_count} new, {updated_count} updated.')
+    print(f'\nDone! {new_count} new, {updated_count} updated, {len(unchanged)} skipped, {len(failed)} failed.')
+    if failed:
+        sys.exit(1)
 
 
 if __name__ == '__main__':
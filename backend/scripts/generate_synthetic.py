@@ -0,0 +1,171 @@
+"""Generate a deterministic synthetic policy corpus in a scratch database.
+
+Usage:
+    cd backend
+    python scripts/generate_synthetic.py --scale 100000 [--seed 42] [--db PATH]
+
+Creates the database from docs/schema.sql, loads the real states and
+topics, then writes --scale policies (with topic links) plus roughly one
+guidance document per ten policies. The same --seed always produces the
+same corpus, so benchmark runs are comparable.
+"""
+
+import argparse
+import json
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+
+# Add parent dir to path so we can import models
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from models.ingest import bulk_upsert_policies
+from models.materialized import refresh_materialized
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), '..', 'data')
+SCHEMA_PATH = os.path.join(os.path.dirname(__file__), '..', '..', 'docs', 'schema.sql')
+BATCH_SIZE = 10_000
+
+SUBJECTS = [
+    'Artificial Intelligence', 'Generative AI', 'AI Literacy', 'Machine Learning',
+    'Chatbot', 'Automated Decision Systems', 'Algorithmic Accountability', 'AI Tutoring',
+]
+SETTINGS = [
+    'K-12 Schools', 'Public Schools', 'Higher Education', 'Classrooms',
+    'School Districts', 'Community Colleges', 'Early Learning', 'Career and Technical Education',
+]
+ACTIONS = [
+    'Establishes a task force to study', 'Requires school districts to adopt policies on',
+    'Directs the Department of Education to publish guidance on', 'Creates a grant program for',
+    'Prohibits the use of student data to train', 'Requires professional development on',
+    'Adds instruction on', 'Sets procurement standards for',
+]
+CONCERNS = [
+    'student data privacy', 'academic integrity', 'teacher training', 'equitable access',
+    'assessment practices', 'curriculum standards', 'workforce readiness', 'vendor transparency',
+]
+BILL_PREFIXES = ['HB', 'SB', 'AB', 'HF', 'SF', 'A', 'S']
+STATUSES = [('introduced', 0.45), ('enacted', 0.25), ('failed', 0.15), ('active', 0.15)]
+
+
+def _summary(rng, subject, setting):
+    sentences = []
+    for _ in range(rng.randint(2, 6)):
+        sentences.append(f'{rng.choice(ACTIONS)} {subject.lower()} in {setting.lower()}, '
+                         f'with attention to {rng.choice(CONCERNS)}.')
+    return ' '.join(sentences)
+
+
+def synthetic_policies(count, states, topics, seed=42):
+    """Yield count reproducible policy dicts in the seed_policies.json shape."""
+    rng = random.Random(seed)
+    status_names = [s for s, _ in STATUSES]
+    status_weights = [w for _, w in STATUSES]
+    for i in range(count):
+        federal = rng.random() < 0.05
+        subject = rng.choice(SUBJECTS)
+        setting = rng.choice(SETTINGS)
+        policy_type = rng.choices(['bill', 'guidance', 'executive_order'], [0.7, 0.22, 0.08])[0]
+        status = rng.choices(status_names, status_weights)[0]
+        if policy_type == 'guidance':
+            status = 'active'
+        year = rng.randint(2019, 2026)
+        introduced = f'{year}-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}'
+        bill_number = f'{rng.choice(BILL_PREFIXES)} {i}' if policy_type == 'bill' else None
+        title = f'{subject} in {setting} Act' if policy_type == 'bill' else f'{subject} Guidance for {setting}'
+        yield {
+            'state': None if federal else rng.choice(states),
+            'title': f'{bill_number} - {title}' if bill_number else f'{title} #{i}',
+            'description': f'{rng.choice(ACTIONS)} {subject.lower()} in {setting.lower()}.',
+            'policy_type': policy_type,
+            'level': 'federal' if federal else 'state',
+            'status': status,
+            'date_introduced': introduced if rng.random() > 0.02 else None,
+            'date_enacted': f'{year}-12-31' if status == 'enacted' else None,
+            'bill_number': bill_number,
+            'sponsor': f'Sponsor {rng.randint(1, 2000)}' if policy_type == 'bill' else None,
+            'summary_text': _summary(rng, subject, setting),
+            'source_url': f'https://example.org/policies/{i}',
+            'topics': rng.sample(topics, rng.randint(1, 3)),
+        }
+
+
+def create_scratch_db(db_path):
+    """Create db_path from the schema and load the real states and topics."""
+    if os.path.exists(db_path):
+        os.remove(db_path)
+    db = sqlite3.connect(db_path)
+    db.row_factory = sqlite3.Row
+    with open(SCHEMA_PATH) as f:
+        db.executescript(f.read())
+
+    with open(os.path.join(DATA_DIR, 'states.json')) as f:
+        states = json.load(f)
+    with open(os.path.join(DATA_DIR, 'seed_policies.json')) as f:
+        topics = json.load(f)['topics']
+    db.executemany('INSERT INTO states (name, code, fips, region) VALUES (?, ?, ?, ?)',
+                   [(s['name'], s['code'], s['fips'], s['region']) for s in states])
+    db.executemany('INSERT INTO topics (name, description) VALUES (?, ?)',
+                   [(t['name'], t['description']) for t in topics])
+    db.commit()
+    return db
+
+
+def generate(db_path, scale, seed=42):
+    """Build a scratch database at db_path holding scale synthetic policies."""
+    db = create_scratch_db(db_path)
+    state_map = {r['code']: r['id'] for r in db.execute('SELECT id, code FROM states')}
+    topic_map = {r['name']: r['id'] for r in db.execute('SELECT id, name FROM topics')}
+
+    rng = random.Random(seed + 1)
+    batch = []
+    documents = []
+    for p in synthetic_policies(scale, list(state_map), list(topic_map), seed):
+        batch.append(p)
+        if len(batch) == BATCH_SIZE:
+            ids, _ = bulk_upsert_policies(db, batch, state_map, topic_map)
+            documents.extend(_documents(rng, batch, ids, state_map))
+            batch = []
+    if batch:
+        ids, _ = bulk_upsert_policies(db, batch, state_map, topic_map)
+        documents.extend(_documents(rng, batch, ids, state_map))
+
+    db.executemany('''
+        INSERT INTO documents (state_id, policy_id, title, doc_type, source_url, extracted_text, date_added)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+    ''', documents)
+    refresh_materialized(db)
+    db.commit()
+    db.execute('ANALYZE')
+    db.close()
+
+
+def _documents(rng, policies, ids, state_map):
+    docs = []
+    for p, policy_id in zip(policies, ids):
+        if rng.random() < 0.1:
+            text = ' '.join(p['summary_text'] for _ in range(rng.randint(5, 40)))
+            docs.append((state_map.get(p['state']), policy_id, f"{p['title']} (full text)",
+                         rng.choice(['pdf', 'webpage', 'report']), p['source_url'],
+                         text, p['date_introduced']))
+    return docs
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Generate a synthetic policy database')
+    parser.add_argument('--scale', type=int, default=10_000, help='Number of policies')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--db', default=None, help='Output path (default: <tmpdir>/statescope_<scale>.db)')
+    args = parser.parse_args()
+
+    db_path = args.db or os.path.join(tempfile.gettempdir(), f'statescope_{args.scale}.db')
+    start = time.perf_counter()
+    generate(db_path, args.scale, args.seed)
+    print(f'Wrote {args.scale:,} policies to {db_path} in {time.perf_counter() - start:.1f}s')
+
+
+if __name__ == '__main__':
+    main()
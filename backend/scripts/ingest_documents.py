@@ -0,0 +1,107 @@
+"""Extract, chunk and index guidance documents (PDF / HTML) into the documents table.
+
+Usage:
+    cd backend
+    python scripts/ingest_documents.py --manifest data/documents.json [--workers 4]
+    python scripts/ingest_documents.py path/to/guidance.pdf https://example.gov/ai-guidance.html --state CA
+
+The manifest is a JSON list of objects with "source" (path or URL) and
+optionally "state" (code), "bill_number" (links the policy), "title" and
+"doc_type". Extraction runs in a process pool; only the parent writes to
+the database, committing every COMMIT_EVERY documents. Re-ingesting a
+source replaces its earlier copy. PDFs need `pip install pypdf`.
+"""
+
+import argparse
+import json
+import os
+import sqlite3
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from datetime import date
+
+# Add parent dir to path so we can import models
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from models.ingest import replace_document
+from models.materialized import bump_data_version
+from services.documents import extract_document
+
+DB_PATH = os.path.join(os.path.dirname(__file__), '..', 'data', 'education_policy.db')
+COMMIT_EVERY = 20
+
+
+def load_sources(args):
+    sources = []
+    if args.manifest:
+        with open(args.manifest) as f:
+            sources.extend(json.load(f))
+    sources.extend({'source': s, 'state': args.state} for s in args.sources)
+    return sources
+
+
+def extract_all(sources, workers):
+    """Yield extracted documents as workers finish, keeping at most
+    2 * workers in flight so results never pile up in memory."""
+    pending = iter(sources)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        running = set()
+        while True:
+            for source in pending:
+                running.add(pool.submit(extract_document, source))
+                if len(running) >= workers * 2:
+                    break
+            if not running:
+                return
+            done, running = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield future.result()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Ingest guidance documents')
+    parser.add_argument('sources', nargs='*', help='Document paths or URLs')
+    parser.add_argument('--manifest', help='JSON list of {"source", "state", "bill_number", "title", "doc_type"}')
+    parser.add_argument('--state', help='State code for sources given on the command line')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--db', default=DB_PATH)
+    args = parser.parse_args()
+
+    sources = load_sources(args)
+    if not sources:
+        parser.error('give document paths/URLs or --manifest')
+
+    db = sqlite3.connect(args.db)
+    state_map = {code: sid for sid, code in db.execute('SELECT id, code FROM states')}
+
+    start = time.perf_counter()
+    stored = failed = chunks = 0
+    for doc in extract_all(sources, args.workers):
+        if 'error' in doc:
+            failed += 1
+            print(f'  FAILED {doc["source"]}: {doc["error"]}')
+            continue
+        state_id = state_map.get((doc.get('state') or '').upper())
+        policy_id = None
+        if doc.get('bill_number'):
+            row = db.execute('SELECT id FROM policies WHERE COALESCE(state_id, 0) = ? AND bill_number = ?',
+                             (state_id or 0, doc['bill_number'])).fetchone()
+            policy_id = row[0] if row else None
+        replace_document(db, doc, state_id, policy_id, date.today().isoformat())
+        stored += 1
+        chunks += len(doc['chunks'])
+        print(f'  {doc["title"][:60]} ({len(doc["text"]):,} chars, {len(doc["chunks"])} chunks)')
+        if stored % COMMIT_EVERY == 0:
+            db.commit()
+
+    if stored:
+        bump_data_version(db)
+    db.commit()
+    db.close()
+    print(f'\nDone! {stored} documents ({chunks} chunks) stored, {failed} failed, '
+          f'in {time.perf_counter() - start:.1f}s')
+
+
+if __name__ == '__main__':
+    main()
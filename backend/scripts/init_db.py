@@ -2,21 +2,113 @@
 
 import os
 import sqlite3
+import sys
+
+# Add parent dir to path so we can import models
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from models.materialized import refresh_materialized
 
 DB_PATH = os.path.join(os.path.dirname(__file__), '..', 'data', 'education_policy.db')
 SCHEMA_PATH = os.path.join(os.path.dirname(__file__), '..', '..', 'docs', 'schema.sql')
 
+# Columns added after a table first shipped: CREATE TABLE IF NOT EXISTS
+# leaves existing tables alone, so older databases get them here
+MIGRATIONS = [
+    ('policy_topics', 'source', "TEXT NOT NULL DEFAULT 'curated'"),
+    ('congress_sync', 'subjects', 'TEXT'),
+]
+
+
+def migrate(db):
+    for table, column, ddl in MIGRATIONS:
+        columns = {row[1] for row in db.execute(f'PRAGMA table_info({table})')}
+        if column in columns:
+            continue
+        db.execute(f'ALTER TABLE {table} ADD COLUMN {column} {ddl}')
+        print(f'Migrated: added {table}.{column}')
+        if (table, column) == ('policy_topics', 'source'):
+            # Congress.gov bills were always keyword-tagged
+            db.execute("""
+                UPDATE policy_topics SET source = 'classifier'
+                WHERE policy_id IN (SELECT policy_id FROM congress_sync)
+            """)
+
+
+# Natural keys enforced by the unique idx_policies_*_key indexes in schema.sql
+NATURAL_KEYS = [
+    ('bill_number IS NOT NULL', 'bill_number'),
+    ('bill_number IS NULL', 'title'),
+]
+
+
+def merge_duplicate_policies(db):
+    """Fold policies that share a natural key into the newest (highest id) copy.
+
+    Databases from before the unique natural-key indexes can hold such
+    duplicates, and CREATE UNIQUE INDEX fails on them, so this runs before
+    the schema script. Topic links, documents and Congress.gov sync cursors
+    are repointed to the kept row.
+    """
+    tables = {row[0] for row in db.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+    if 'policies' not in tables:
+        return
+    merges = []
+    for where, column in NATURAL_KEYS:
+        merges += db.execute(f"""
+            SELECT p.id, k.keep_id FROM policies p
+            JOIN (SELECT COALESCE(state_id, 0) AS state_key, {column} AS value, MAX(id) AS keep_id
+                  FROM policies WHERE {where}
+                  GROUP BY state_key, value HAVING COUNT(*) > 1) k
+              ON COALESCE(p.state_id, 0) = k.state_key AND p.{column} = k.value
+            WHERE p.{where} AND p.id != k.keep_id
+        """).fetchall()
+    if not merges:
+        return
+
+    db.execute('CREATE TEMP TABLE policy_merges (old_id INTEGER PRIMARY KEY, new_id INTEGER NOT NULL)')
+    db.executemany('INSERT INTO policy_merges (old_id, new_id) VALUES (?, ?)', merges)
+    columns = ['topic_id']
+    if 'source' in {row[1] for row in db.execute('PRAGMA table_info(policy_topics)')}:
+        columns.append('source')  # not migrated yet on the oldest databases
+    db.execute(f"""
+        INSERT OR IGNORE INTO policy_topics (policy_id, {', '.join(columns)})
+        SELECT m.new_id, {', '.join(f'pt.{c}' for c in columns)}
+        FROM policy_topics pt JOIN policy_merges m ON m.old_id = pt.policy_id
+    """)
+    db.execute('DELETE FROM policy_topics WHERE policy_id IN (SELECT old_id FROM policy_merges)')
+    for table in ('documents', 'congress_sync'):
+        if table in tables:
+            db.execute(f"""
+                UPDATE {table}
+                SET policy_id = (SELECT new_id FROM policy_merges WHERE old_id = {table}.policy_id)
+                WHERE policy_id IN (SELECT old_id FROM policy_merges)
+            """)
+    if 'policy_snippets' in tables:
+        db.execute('DELETE FROM policy_snippets WHERE policy_id IN (SELECT old_id FROM policy_merges)')
+    db.execute('DELETE FROM policies WHERE id IN (SELECT old_id FROM policy_merges)')
+    db.execute('DROP TABLE policy_merges')
+    db.commit()
+    print(f'Migrated: merged {len(merges)} duplicate policies into their newest copy')
+
 
-def init_db():
-    os.makedirs(os.path.dirname(DB_PATH), exist_ok=True)
+def init_db(path=DB_PATH):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
 
     with open(SCHEMA_PATH) as f:
         schema = f.read()
 
-    db = sqlite3.connect(DB_PATH)
+    db = sqlite3.connect(path)
+    merge_duplicate_policies(db)
     db.executescript(schema)
+    migrate(db)
+    # Re-index rows that predate the FTS table (no-op cost on a fresh DB)
+    db.execute("INSERT INTO policies_fts (policies_fts) VALUES ('rebuild')")
+    db.execute("INSERT INTO document_chunks_fts (document_chunks_fts) VALUES ('rebuild')")
+    refresh_materialized(db)
+    db.commit()
     db.close()
-    print(f'Database created at {os.path.abspath(DB_PATH)}')
+    print(f'Database created at {os.path.abspath(path)}')
 
 
 if __name__ == '__main__':
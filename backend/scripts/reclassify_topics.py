@@ -0,0 +1,89 @@
+"""Re-tag every policy with the current keyword classifier in one transaction.
+
+Usage:
+    cd backend
+    python scripts/reclassify_topics.py [--dry-run]
+
+Run after editing services/topic_classifier.TOPIC_KEYWORDS instead of
+re-fetching anything. Only classifier-sourced links are replaced; policies
+with curated topics keep them. Congress.gov bills are classified on the
+legislative subjects recorded at sync time as well as their text, so the
+result matches what a fresh fetch would produce.
+"""
+
+import argparse
+import json
+import os
+import sqlite3
+import sys
+import time
+
+# Add parent dir to path so we can import models
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import config
+from models.materialized import refresh_materialized
+from services.topic_classifier import classify_policy
+
+BATCH_SIZE = 5000
+
+
+def classifier_links(db, topic_map):
+    """Yield (policy_id, topic_id, 'classifier') for every policy without curated topics."""
+    rows = db.execute('''
+        SELECT p.id, p.title, p.description, p.summary_text,
+               (SELECT cs.subjects FROM congress_sync cs WHERE cs.policy_id = p.id LIMIT 1)
+        FROM policies p
+        WHERE NOT EXISTS (
+            SELECT 1 FROM policy_topics pt WHERE pt.policy_id = p.id AND pt.source = 'curated'
+        )
+    ''')
+    while True:
+        batch = rows.fetchmany(BATCH_SIZE)
+        if not batch:
+            return
+        for policy_id, title, description, summary_text, subjects in batch:
+            for name in classify_policy(title, description, summary_text, json.loads(subjects or '[]')):
+                if name in topic_map:
+                    yield policy_id, topic_map[name], 'classifier'
+
+
+def reclassify(db):
+    """Replace all classifier links; returns (removed, added, policies). Does not commit."""
+    topic_map = {name: tid for tid, name in db.execute('SELECT id, name FROM topics')}
+    before = set(db.execute("SELECT policy_id, topic_id FROM policy_topics WHERE source = 'classifier'"))
+
+    # Classify first (reads only curated links), then swap the link sets
+    links = list(classifier_links(db, topic_map))
+    db.execute("DELETE FROM policy_topics WHERE source = 'classifier'")
+    db.executemany('INSERT OR IGNORE INTO policy_topics (policy_id, topic_id, source) VALUES (?, ?, ?)', links)
+
+    after = {(policy_id, topic_id) for policy_id, topic_id, _ in links}
+    return len(before - after), len(after - before), len({policy_id for policy_id, _, _ in links})
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Re-run the topic classifier over all policies')
+    parser.add_argument('--db', default=config.DATABASE_PATH)
+    parser.add_argument('--dry-run', action='store_true', help='Report the changes without saving them')
+    args = parser.parse_args()
+
+    db = sqlite3.connect(args.db)
+    start = time.perf_counter()
+    db.execute('BEGIN IMMEDIATE')
+    removed, added, policies = reclassify(db)
+    if args.dry_run:
+        db.rollback()
+    else:
+        if removed or added:
+            refresh_materialized(db)
+        db.commit()
+    db.close()
+
+    action = 'Would change' if args.dry_run else 'Changed'
+    print(f'{action} topic links for {policies:,} classified policies: {added:,} added, {removed:,} removed '
+          f'({time.perf_counter() - start:.2f}s)')
+
+
+if __name__ == '__main__':
+    main()
@@ -6,7 +6,10 @@ Phase B: Web search for 2025-2026 data via NCSL and state legislature sites
 Usage:
     cd backend
     source venv/bin/activate
-    python scripts/research_policies.py [--phase a|b|both] [--states CA,NY,TX]
+    python scripts/research_policies.py [--phase a|b|both] [--states CA,NY,TX] [--concurrency 4] [--fresh]
+
+Phase A checkpoints every finished batch to data/research_journal.jsonl;
+rerunning after a crash skips the states already done (--fresh starts over).
 
 Requires ANTHROPIC_API_KEY in .env
 """
@@ -16,7 +19,9 @@ import json
 import os
 import re
 import sys
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
 
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
@@ -24,6 +29,7 @@ import config
 
 DATA_DIR = os.path.join(os.path.dirname(__file__), '..', 'data')
 OUTPUT_PATH = os.path.join(DATA_DIR, 'researched_policies.json')
+JOURNAL_PATH = os.path.join(DATA_DIR, 'research_journal.jsonl')
 SEED_PATH = os.path.join(DATA_DIR, 'seed_policies.json')
 
 ALL_STATES = [
@@ -60,6 +66,8 @@ VALID_TOPICS = {
 }
 
 BATCH_SIZE = 5
+MAX_CONCURRENT_BATCHES = 4
+MAX_BATCH_ATTEMPTS = 5
 
 
 def validate_policy(policy):
@@ -89,50 +97,288 @@ def validate_policy(policy):
     return errors
 
 
+_decoder = json.JSONDecoder()
+_SEPARATORS = re.compile(r'[\s,]*')
+_OPEN = re.compile(r'[\[{]')
+_FENCE = re.compile(r'```(?:json)?\s*')
+_VALUE_START = set('"-0123456789tfn[{')
+
+
+class PolicyStream:
+    """Incrementally pull policy objects out of Claude's response text.
+
+    Understands the shapes the prompts produce: an array of policies, a
+    single policy object, or an object mapping state codes to arrays. Feed
+    it text as it streams; each policy is decoded with raw_decode once its
+    closing brace has arrived and consumed text is dropped, so total work
+    is linear in the response length. A response cut off mid-array still
+    yields every complete policy before the cut.
+    """
+
+    def __init__(self):
+        self.buf = ''
+        self.pos = 0
+        self.state = 'seek'   # seek | array | entry | single | done
+        self.found = 0
+        self.complete = False  # a whole top-level array/object was parsed
+        self._mapping = False
+        self._scalar_entry = False  # the object has a non-array value, so isn't a pure mapping
+        self._found_before = 0
+        self._object_start = 0
+        self._retry_from = 0  # a partial value is retried only once a later '}' or ']' arrives
+
+    def feed(self, chunk):
+        """Add streamed text; return the policies it completed."""
+        self.buf += chunk
+        return list(self._drain(final=False))
+
+    def close(self):
+        """End of response: return what is left, dropping a truncated tail."""
+        return list(self._drain(final=True))
+
+    def _decode(self, final):
+        """Decode the value at pos, or return None if it is incomplete/malformed."""
+        since = max(self._retry_from, self.pos)
+        if not final and self.buf.find('}', since) == -1 and self.buf.find(']', since) == -1:
+            return None
+        try:
+            value, self.pos = _decoder.raw_decode(self.buf, self.pos)
+        except json.JSONDecodeError:
+            self._retry_from = len(self.buf)
+            return None
+        self._retry_from = 0
+        return (value,)
+
+    def _entry_value(self):
+        """Index of the value in a '"key": value' entry at pos, or None."""
+        try:
+            _, end = _decoder.raw_decode(self.buf, self.pos)
+        except json.JSONDecodeError:
+            return None
+        end = _SEPARATORS.match(self.buf, end).end()
+        if self.buf[end:end + 1] != ':':
+            return None
+        end = _SEPARATORS.match(self.buf, end + 1).end()
+        return end if end < len(self.buf) else None
+
+    def _done_or_seek(self):
+        # "[1]" or "{}" in surrounding prose is not the answer; keep looking
+        self.complete = True
+        return 'done' if self.found else 'seek'
+
+    def _drain(self, final):
+        while True:
+            if self.pos > 4096 and self.state in ('seek', 'array'):
+                # An array that hasn't produced a policy yet may be rescanned from its start
+                keep = self.pos
+                if self.state == 'array' and self.found == self._found_before:
+                    keep = self._object_start
+                if keep:
+                    self.buf = self.buf[keep:]
+                    self._retry_from = max(self._retry_from - keep, 0)
+                    self._object_start = max(self._object_start - keep, 0)
+                    self.pos -= keep
+
+            if self.state == 'seek':
+                match = _OPEN.search(self.buf, self.pos)
+                if not match:
+                    self.pos = len(self.buf)
+                    return
+                self.pos = match.end()
+                self._object_start = match.start()
+                self._mapping = False
+                self._scalar_entry = False
+                self._found_before = self.found
+                self.state = 'array' if match.group() == '[' else 'entry'
+                continue
+            if self.state == 'done':
+                return
+
+            self.pos = _SEPARATORS.match(self.buf, self.pos).end()
+            if self.pos >= len(self.buf):
+                return
+            c = self.buf[self.pos]
+
+            if self.state == 'array':
+                if c == ']':
+                    self.pos += 1
+                    if self._mapping:
+                        self.state = 'entry'
+                    elif self.found == self._found_before:
+                        # No policy in it: "[1]" in prose, or prose that swallowed the
+                        # real array as an element. Rescan from just inside the bracket.
+                        self.complete = True
+                        self.pos = self._object_start + 1
+                        self.state = 'seek'
+                    else:
+                        self.state = self._done_or_seek()
+                    continue
+                if c not in _VALUE_START:
+                    self.state = 'seek'  # prose such as "[see below]"
+                    continue
+                decoded = self._decode(final)
+                if decoded is None:
+                    if not final:
+                        return
+                    if not self._mapping and self.found == self._found_before:
+                        # Prose such as "see [note]": the answer comes after the bracket
+                        self.pos = self._object_start + 1
+                        self.state = 'seek'
+                        continue
+                    # Truncated or malformed element: resume at the next object
+                    match = _OPEN.search(self.buf, self.pos + 1)
+                    if not match:
+                        self.pos = len(self.buf)
+                        return
+                    self.pos = match.start()
+                    continue
+                if isinstance(decoded[0], dict):
+                    self.found += 1
+                    yield decoded[0]
+
+            elif self.state == 'entry':
+                # Inside a top-level object: {"CA": [...]} is a state mapping,
+                # anything else is a single policy
+                if c == '}':
+                    if self._mapping and self._scalar_entry and self.found == self._found_before:
+                        # {"topics": [...], "title": ...} was a policy, not a mapping;
+                        # {"CA": [], "NY": []} is a mapping that found nothing
+                        self.pos = self._object_start
+                        self.state = 'single'
+                        continue
+                    self.pos += 1
+                    self.state = self._done_or_seek()
+                    continue
+                value = self._entry_value() if c == '"' else None
+                if value is None:
+                    if not final and c == '"':
+                        return
+                    self.pos = self._object_start + 1
+                    self.state = 'seek'
+                elif self.buf[value] == '[':
+                    self.pos = value + 1
+                    self._mapping = True
+                    self.state = 'array'
+                elif self._mapping:
+                    self._scalar_entry = True
+                    entry_start, self.pos = self.pos, value
+                    if self._decode(final) is None:
+                        if not final:
+                            self.pos = entry_start  # re-read the whole entry once more arrives
+                            return
+                        self.state = 'seek'
+                else:
+                    self.pos = self._object_start
+                    self.state = 'single'
+
+            elif self.state == 'single':
+                decoded = self._decode(final)
+                if decoded is None:
+                    if not final:
+                        return
+                    self.pos = self._object_start + 1
+                    self.state = 'seek'
+                    continue
+                self.found += 1
+                yield decoded[0]
+                self.state = 'done'
+
+
 def extract_json(text):
-    """Extract JSON from Claude's response text."""
-    # Try to find JSON block in markdown code fence
-    match = re.search(r'```(?:json)?\s*(\[[\s\S]*?\])\s*```', text)
-    if match:
-        return json.loads(match.group(1))
-    match = re.search(r'```(?:json)?\s*(\{[\s\S]*?\})\s*```', text)
-    if match:
-        parsed = json.loads(match.group(1))
-        # If it's a dict mapping state codes to arrays, flatten
-        if all(isinstance(v, list) for v in parsed.values()):
-            result = []
-            for policies in parsed.values():
-                result.extend(policies)
-            return result
-        return [parsed]
-    # Try raw JSON
-    for start in range(len(text)):
-        if text[start] in '[{':
+    """Extract the policy objects from Claude's response text.
+
+    Brackets in surrounding prose are skipped:
+
+    >>> extract_json('See [note] then [{"title": "A"}]')
+    [{'title': 'A'}]
+    >>> extract_json('Policies (see [the list]): [{"title": "A"}]')
+    [{'title': 'A'}]
+    >>> extract_json('{"CA": [], "NY": []}')
+    []
+    """
+    # Prefer the fenced block when there is one
+    fence = _FENCE.search(text)
+    stream = PolicyStream()
+    policies = stream.feed(text[fence.end():] if fence else text)
+    policies.extend(stream.close())
+    if not policies and not stream.complete:
+        raise ValueError("Could not extract JSON from response")
+    return policies
+
+
+class AdaptiveRateLimiter:
+    """Paces API calls from the rate-limit headers the Anthropic API returns.
+
+    Shared by all batch threads: when the remaining request or token budget
+    runs low (or the API answers 429 with retry-after), every caller waits
+    until the advertised reset time instead of sleeping a fixed interval.
+    """
+
+    LOW_WATERMARK = 1          # pause when this many requests remain
+    LOW_TOKEN_WATERMARK = 8000  # ... or fewer output tokens than one batch may use
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._resume_at = 0.0
+
+    def wait(self):
+        while True:
+            with self._lock:
+                delay = self._resume_at - time.time()
+            if delay <= 0:
+                return
+            time.sleep(min(delay, 5))
+
+    def update(self, headers):
+        resume_at = 0.0
+        retry_after = headers.get("retry-after")
+        if retry_after:
+            try:
+                resume_at = time.time() + float(retry_after)
+            except ValueError:
+                pass
+        for kind, watermark in (("requests", self.LOW_WATERMARK), ("output-tokens", self.LOW_TOKEN_WATERMARK)):
+            remaining = headers.get(f"anthropic-ratelimit-{kind}-remaining")
+            reset = headers.get(f"anthropic-ratelimit-{kind}-reset")
+            if remaining is not None and reset and int(remaining) <= watermark:
+                try:
+                    reset_at = datetime.fromisoformat(reset.replace("Z", "+00:00")).timestamp()
+                except ValueError:
+                    continue
+                resume_at = max(resume_at, reset_at)
+        if resume_at:
+            with self._lock:
+                self._resume_at = max(self._resume_at, resume_at)
+
+
+def load_journal(path):
+    """Return (completed_states, policies) checkpointed by earlier runs."""
+    completed = set()
+    policies = []
+    if not os.path.exists(path):
+        return completed, policies
+    with open(path) as f:
+        for line in f:
             try:
-                parsed = json.loads(text[start:])
-                if isinstance(parsed, dict):
-                    if all(isinstance(v, list) for v in parsed.values()):
-                        result = []
-                        for policies in parsed.values():
-                            result.extend(policies)
-                        return result
-                    return [parsed]
-                return parsed
+                entry = json.loads(line)
             except json.JSONDecodeError:
-                continue
-    raise ValueError("Could not extract JSON from response")
+                continue  # torn write from a crash mid-append
+            completed.update(entry["states"])
+            policies.extend(entry["policies"])
+    return completed, policies
 
 
-def phase_a_research(client, states):
-    """Phase A: Use Claude API to get baseline policy data."""
-    all_policies = []
-    batches = [states[i:i + BATCH_SIZE] for i in range(0, len(states), BATCH_SIZE)]
+def _append_journal(path, lock, batch, policies):
+    entry = {"states": batch, "policies": policies, "completed_at": datetime.now().isoformat()}
+    with lock, open(path, "a") as f:
+        f.write(json.dumps(entry) + "\n")
+        f.flush()
+        os.fsync(f.fileno())
 
-    for batch_num, batch in enumerate(batches, 1):
-        state_names = [f"{STATE_NAMES[s]} ({s})" for s in batch]
-        print(f"\n  Batch {batch_num}/{len(batches)}: {', '.join(batch)}")
 
-        prompt = f"""Research real, verifiable AI-in-education policies for these US states: {', '.join(state_names)}.
+def _batch_prompt(batch):
+    state_names = [f"{STATE_NAMES[s]} ({s})" for s in batch]
+    return f"""Research real, verifiable AI-in-education policies for these US states: {', '.join(state_names)}.
 
 For EACH state, find ALL of these that exist:
 1. State legislation (bills) related to AI in K-12 or higher education
@@ -166,34 +412,84 @@ Return a JSON array of all policies found across these states:
 [{{"state": "XX", "title": "...", ...}}, ...]
 ```"""
 
-        try:
-            message = client.messages.create(
-                model="claude-sonnet-4-20250514",
-                max_tokens=8000,
-                messages=[{"role": "user", "content": prompt}],
-            )
-            text = message.content[0].text
-            policies = extract_json(text)
 
-            valid_count = 0
-            for p in policies:
-                errors = validate_policy(p)
-                if errors:
-                    print(f"    SKIP (validation): {p.get('title', '?')} - {errors}")
-                else:
-                    all_policies.append(p)
-                    valid_count += 1
+def _keep_valid(policy, valid):
+    errors = validate_policy(policy)
+    if errors:
+        print(f"    SKIP (validation): {policy.get('title', '?')} - {errors}")
+    else:
+        valid.append(policy)
 
-            print(f"    Found {valid_count} valid policies")
 
-        except Exception as e:
-            print(f"    ERROR: {e}")
+def _research_batch(client, batch, limiter):
+    """Stream one batch from Claude and return its valid policies.
 
-        # Rate-limit between batches
-        if batch_num < len(batches):
-            time.sleep(2)
+    Policies are parsed and validated as they arrive rather than after the
+    whole response has been generated.
+    """
+    for attempt in range(MAX_BATCH_ATTEMPTS):
+        limiter.wait()
+        valid = []
+        parser = PolicyStream()
+        try:
+            with client.messages.stream(
+                model="claude-sonnet-4-20250514",
+                max_tokens=8000,
+                messages=[{"role": "user", "content": _batch_prompt(batch)}],
+            ) as stream:
+                limiter.update(stream.response.headers)
+                for text in stream.text_stream:
+                    for policy in parser.feed(text):
+                        _keep_valid(policy, valid)
+        except Exception as e:
+            response = getattr(e, "response", None)
+            if getattr(e, "status_code", None) == 429 and response is not None:
+                limiter.update(response.headers)
+                continue
+            raise
+        for policy in parser.close():
+            _keep_valid(policy, valid)
+        if not valid and not parser.complete:
+            raise ValueError("Could not extract JSON from response")
+        return valid
+    raise RuntimeError(f"rate limited {MAX_BATCH_ATTEMPTS} times")
+
+
+def phase_a_research(client, states, concurrency=MAX_CONCURRENT_BATCHES, journal_path=JOURNAL_PATH):
+    """Phase A: Use Claude API to get baseline policy data.
+
+    Batches run concurrently (bounded by concurrency) and each finished
+    batch is appended to the journal, so a rerun after a crash skips the
+    states already researched. Returns (policies, complete); the caller
+    removes the journal once complete results are safely written out.
+    """
+    completed, all_policies = load_journal(journal_path)
+    if completed:
+        print(f"  Resuming: {len(completed)} states already researched ({len(all_policies)} policies)")
+    pending = [s for s in states if s not in completed]
+    batches = [pending[i:i + BATCH_SIZE] for i in range(0, len(pending), BATCH_SIZE)]
+
+    limiter = AdaptiveRateLimiter()
+    journal_lock = threading.Lock()
+    failures = 0
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        futures = {pool.submit(_research_batch, client, batch, limiter): batch for batch in batches}
+        for done_count, future in enumerate(as_completed(futures), 1):
+            batch = futures[future]
+            try:
+                policies = future.result()
+            except Exception as e:
+                failures += 1
+                print(f"\n  Batch {done_count}/{len(batches)} ({', '.join(batch)}): ERROR: {e}")
+                continue
+            _append_journal(journal_path, journal_lock, batch, policies)
+            all_policies.extend(policies)
+            print(f"\n  Batch {done_count}/{len(batches)} ({', '.join(batch)}): found {len(policies)} valid policies")
 
-    return all_policies
+    if failures:
+        print(f"  {failures} batch(es) failed; rerun to retry them (completed states are skipped)")
+    return all_policies, not failures
 
 
 def phase_b_search(client):
@@ -288,6 +584,10 @@ def main():
                         help="Which phase to run (default: both)")
     parser.add_argument("--states", type=str, default=None,
                         help="Comma-separated state codes (default: all)")
+    parser.add_argument("--concurrency", type=int, default=MAX_CONCURRENT_BATCHES,
+                        help=f"Phase A batches in flight (default: {MAX_CONCURRENT_BATCHES})")
+    parser.add_argument("--fresh", action="store_true",
+                        help="Ignore the Phase A journal left by an interrupted run")
     args = parser.parse_args()
 
     if not config.ANTHROPIC_API_KEY:
@@ -299,6 +599,7 @@ def main():
 
     states = args.states.split(",") if args.states else ALL_STATES
     all_policies = []
+    phase_a_complete = False
 
     # Load existing researched data if it exists
     if os.path.exists(OUTPUT_PATH):
@@ -309,7 +610,9 @@ def main():
 
     if args.phase in ("a", "both"):
         print("\n=== Phase A: Claude API baseline research ===")
-        phase_a = phase_a_research(client, states)
+        if args.fresh and os.path.exists(JOURNAL_PATH):
+            os.remove(JOURNAL_PATH)
+        phase_a, phase_a_complete = phase_a_research(client, states, concurrency=args.concurrency)
         all_policies.extend(phase_a)
         print(f"\nPhase A total: {len(phase_a)} policies")
 
@@ -329,10 +632,14 @@ def main():
     print(f"States covered: {len(states_covered)}/51")
     print(f"Missing states: {sorted(set(ALL_STATES) - states_covered)}")
 
-    # Write output
-    with open(OUTPUT_PATH, 'w') as f:
+    # Write output atomically; only then is the Phase A journal redundant
+    tmp_path = OUTPUT_PATH + ".tmp"
+    with open(tmp_path, 'w') as f:
         json.dump(all_policies, f, indent=2)
+    os.replace(tmp_path, OUTPUT_PATH)
     print(f"\nWritten to {OUTPUT_PATH}")
+    if phase_a_complete and os.path.exists(JOURNAL_PATH):
+        os.remove(JOURNAL_PATH)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,120 @@
+"""Persistent answer cache for /api/ask.
+
+Answers live in their own SQLite file so the policy database stays
+read-only at serve time. Entries are keyed on the normalized question, the
+ids of the retrieved policies, the model and the data version, so a new
+ingest or a different retrieval result never serves a stale answer.
+Entries expire after ANSWER_CACHE_TTL seconds and the least recently used
+ones are evicted once the cache holds more than ANSWER_CACHE_MAX_ENTRIES.
+"""
+
+import hashlib
+import json
+import re
+import time
+
+import config
+from models.database import get_db
+from models.queries import get_data_version
+
+_SCHEMA = '''
+CREATE TABLE IF NOT EXISTS answers (
+    key TEXT PRIMARY KEY,
+    question TEXT NOT NULL,
+    payload TEXT NOT NULL,           -- JSON: answer, model
+    created_at REAL NOT NULL,
+    last_used_at REAL NOT NULL,
+    hits INTEGER NOT NULL DEFAULT 0
+);
+
+CREATE INDEX IF NOT EXISTS idx_answers_last_used ON answers(last_used_at);
+
+CREATE TABLE IF NOT EXISTS cache_stats (
+    name TEXT PRIMARY KEY,           -- 'hits', 'misses', 'evictions'
+    value INTEGER NOT NULL DEFAULT 0
+);
+'''
+
+_initialized = set()
+
+
+def _db():
+    db = get_db(readonly=False, path=config.ANSWER_CACHE_PATH)
+    if config.ANSWER_CACHE_PATH not in _initialized:
+        db.executescript(_SCHEMA)
+        _initialized.add(config.ANSWER_CACHE_PATH)
+    return db
+
+
+def _count(db, name, n=1):
+    db.execute('''
+        INSERT INTO cache_stats (name, value) VALUES (?, ?)
+        ON CONFLICT(name) DO UPDATE SET value = value + excluded.value
+    ''', (name, n))
+
+
+def normalize_question(question):
+    """Lowercase, collapse whitespace and drop trailing punctuation."""
+    return re.sub(r'\s+', ' ', question.lower()).strip().rstrip('?.!').strip()
+
+
+def make_key(question, policy_ids, model):
+    """Cache key for a question answered against a given set of policies."""
+    version, _ = get_data_version()
+    raw = json.dumps([normalize_question(question), sorted(policy_ids), model, version])
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+
+def get_answer(key):
+    """Return the cached result dict for key, or None on a miss."""
+    if not config.ANSWER_CACHE_ENABLED:
+        return None
+    db = _db()
+    now = time.time()
+    with db:
+        row = db.execute('SELECT payload, created_at FROM answers WHERE key = ?', (key,)).fetchone()
+        if row and now - row['created_at'] < config.ANSWER_CACHE_TTL:
+            db.execute('UPDATE answers SET last_used_at = ?, hits = hits + 1 WHERE key = ?', (now, key))
+            _count(db, 'hits')
+            return json.loads(row['payload'])
+        _count(db, 'misses')
+    return None
+
+
+def put_answer(key, question, result):
+    """Store a result dict and evict expired / least recently used entries."""
+    if not config.ANSWER_CACHE_ENABLED:
+        return
+    db = _db()
+    now = time.time()
+    payload = json.dumps({'answer': result['answer'], 'model': result.get('model')})
+    with db:
+        db.execute('''
+            INSERT INTO answers (key, question, payload, created_at, last_used_at)
+            VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT(key) DO UPDATE SET
+                payload = excluded.payload,
+                created_at = excluded.created_at,
+                last_used_at = excluded.last_used_at
+        ''', (key, question, payload, now, now))
+        evicted = db.execute('DELETE FROM answers WHERE created_at <= ?',
+                             (now - config.ANSWER_CACHE_TTL,)).rowcount
+        evicted += db.execute('''
+            DELETE FROM answers WHERE key IN (
+                SELECT key FROM answers ORDER BY last_used_at DESC LIMIT -1 OFFSET ?
+            )
+        ''', (config.ANSWER_CACHE_MAX_ENTRIES,)).rowcount
+        if evicted:
+            _count(db, 'evictions', evicted)
+
+
+def cache_stats():
+    """Entry count plus hit / miss / eviction counters shared by all workers."""
+    db = _db()
+    stats = {'hits': 0, 'misses': 0, 'evictions': 0}
+    for row in db.execute('SELECT name, value FROM cache_stats'):
+        stats[row['name']] = row['value']
+    stats['entries'] = db.execute('SELECT COUNT(*) FROM answers').fetchone()[0]
+    lookups = stats['hits'] + stats['misses']
+    stats['hit_rate'] = round(stats['hits'] / lookups, 4) if lookups else 0.0
+    return stats
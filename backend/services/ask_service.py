@@ -0,0 +1,206 @@
+"""The /api/ask pipeline, shared by the Flask routes and the ASGI entry point.
+
+A question is answered by retrieving policies, packing them into the
+context budget, checking the answer cache and finally asking Claude. The
+plain functions serve the WSGI app. The *_async variants serve asgi.py:
+their SQLite work runs on a small thread pool (ASK_DB_THREADS) and Claude
+is awaited on the async client, so one worker can hold many questions
+open. Claude calls also share a per-worker budget of ASK_MAX_CONCURRENCY
+slots; a question that waits longer than ASK_QUEUE_TIMEOUT for one fails
+with AskBusy instead of piling up.
+"""
+
+import asyncio
+import contextvars
+import json
+import math
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+
+import config
+import metrics
+from services.answer_cache import get_answer, make_key, put_answer
+from services.claude_service import MODEL, ask_claude, ask_claude_async, stream_claude, stream_claude_async
+from services.retrieval import build_context, retrieve_context
+
+RETRIEVE_LIMIT = 8
+
+
+class AskBusy(Exception):
+    """Every Claude slot stayed taken for ASK_QUEUE_TIMEOUT seconds."""
+
+    def __init__(self, retry_after):
+        super().__init__(f'Too many questions in progress. Please retry in {retry_after} seconds.')
+        self.retry_after = retry_after
+
+
+def build_sources(policies):
+    """Build source list from retrieved policies."""
+    sources = []
+    for p in policies:
+        source = {
+            'id': p['id'],
+            'title': p['title'],
+            'state': p.get('state_name') or 'Federal',
+            'status': p['status'],
+        }
+        if p.get('source_url'):
+            source['url'] = p['source_url']
+        sources.append(source)
+    return sources
+
+
+def sse(event, data):
+    return f'event: {event}\ndata: {json.dumps(data)}\n\n'
+
+
+def prepare(question):
+    """(context_text, packed policies, answer cache key) for a question."""
+    context_text, policies = build_context(retrieve_context(question, limit=RETRIEVE_LIMIT))
+    return context_text, policies, make_key(question, [p['id'] for p in policies], MODEL)
+
+
+def _response(question, policies, result, cached):
+    return {
+        'question': question,
+        'answer': result['answer'],
+        'sources': build_sources(policies),
+        'model': result.get('model'),
+        'cached': cached,
+    }
+
+
+def answer(question):
+    """The /api/ask JSON response for a question."""
+    context_text, policies, cache_key = prepare(question)
+
+    # Serve repeat questions against the same policies from the cache
+    result = get_answer(cache_key)
+    cached = result is not None
+    if not cached:
+        result = ask_claude(question, context_text)
+        if result.get('model'):
+            put_answer(cache_key, question, result)
+    return _response(question, policies, result, cached)
+
+
+def stream_answer(question):
+    """Yield the Server-Sent Events of /api/ask/stream for a question."""
+    try:
+        context_text, policies, cache_key = prepare(question)
+        yield sse('sources', {'question': question, 'sources': build_sources(policies)})
+
+        result = get_answer(cache_key)
+        if result is not None:
+            yield sse('delta', {'text': result['answer']})
+            yield sse('done', {'model': result.get('model'), 'usage': None, 'cached': True})
+            return
+
+        parts = []
+        info = {}
+        for event, data in stream_claude(question, context_text):
+            if event == 'delta':
+                parts.append(data)
+                yield sse('delta', {'text': data})
+            else:
+                info = data
+
+        if info.get('model'):
+            put_answer(cache_key, question, {'answer': ''.join(parts), 'model': info['model']})
+        yield sse('done', {**info, 'cached': False})
+    except Exception as e:
+        yield sse('error', {'error': str(e)})
+
+
+# -- async variants (asgi.py) -----------------------------------------------
+
+_executor = None
+_executor_lock = threading.Lock()
+_slots = None
+
+
+def _db_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=config.ASK_DB_THREADS, thread_name_prefix='ask-db')
+        return _executor
+
+
+async def run_db(func, *args):
+    """Run blocking SQLite work on the ask thread pool, keeping the request's metrics context."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_db_executor(), contextvars.copy_context().run, func, *args)
+
+
+def shutdown():
+    """Stop the ask thread pool (ASGI lifespan shutdown)."""
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=False, cancel_futures=True)
+            _executor = None
+
+
+@asynccontextmanager
+async def claude_slot():
+    """Hold one of the worker's ASK_MAX_CONCURRENCY Claude slots."""
+    global _slots
+    if _slots is None:
+        _slots = asyncio.Semaphore(config.ASK_MAX_CONCURRENCY)
+    start = time.perf_counter()
+    try:
+        await asyncio.wait_for(_slots.acquire(), config.ASK_QUEUE_TIMEOUT)
+    except asyncio.TimeoutError:
+        metrics.inc('statescope_ask_rejected_total')
+        raise AskBusy(max(math.ceil(config.ASK_QUEUE_TIMEOUT), 1)) from None
+    metrics.observe('statescope_ask_queue_duration_seconds', time.perf_counter() - start)
+    try:
+        yield
+    finally:
+        _slots.release()
+
+
+async def answer_async(question):
+    """answer() without blocking the event loop. Raises AskBusy."""
+    context_text, policies, cache_key = await run_db(prepare, question)
+
+    result = await run_db(get_answer, cache_key)
+    cached = result is not None
+    if not cached:
+        async with claude_slot():
+            result = await ask_claude_async(question, context_text)
+        if result.get('model'):
+            await run_db(put_answer, cache_key, question, result)
+    return _response(question, policies, result, cached)
+
+
+async def stream_answer_async(question):
+    """stream_answer() without blocking the event loop (an async generator)."""
+    try:
+        context_text, policies, cache_key = await run_db(prepare, question)
+        yield sse('sources', {'question': question, 'sources': build_sources(policies)})
+
+        result = await run_db(get_answer, cache_key)
+        if result is not None:
+            yield sse('delta', {'text': result['answer']})
+            yield sse('done', {'model': result.get('model'), 'usage': None, 'cached': True})
+            return
+
+        parts = []
+        info = {}
+        async with claude_slot():
+            async for event, data in stream_claude_async(question, context_text):
+                if event == 'delta':
+                    parts.append(data)
+                    yield sse('delta', {'text': data})
+                else:
+                    info = data
+
+        if info.get('model'):
+            await run_db(put_answer, cache_key, question, {'answer': ''.join(parts), 'model': info['model']})
+        yield sse('done', {**info, 'cached': False})
+    except Exception as e:
+        yield sse('error', {'error': str(e)})
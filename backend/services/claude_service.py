@@ -1,7 +1,18 @@
-"""Claude Q&A service using Anthropic SDK."""
+"""Claude Q&A service using Anthropic SDK.
+
+One Anthropic client per process is reused for every question, so its
+keep-alive connection pool saves a TCP/TLS handshake per call; the ASGI
+entry point uses the AsyncAnthropic equivalents (ask_claude_async,
+stream_claude_async) so a worker can wait on many answers at once. The system
+prompt is sent as a cacheable block and prompt cache reads/writes are
+counted in metrics (statescope_claude_prompt_cache_total).
+"""
+
+import os
+import threading
 
-import anthropic
 import config
+import metrics
 
 SYSTEM_PROMPT = """You are a knowledgeable and friendly assistant specializing in AI in education policy in the United States. You have access to a database of policy data provided below, but you can also draw on your general knowledge to give helpful, well-rounded answers.
 
@@ -17,33 +28,175 @@ Guidelines:
 
 MODEL = "claude-sonnet-4-20250514"
 
+# Marked for prompt caching. The API only caches prefixes above the model's
+# minimum length (1024 tokens for Sonnet) and silently skips shorter ones;
+# the usage counters show whether the prompt is actually being cached.
+SYSTEM_BLOCKS = [{"type": "text", "text": SYSTEM_PROMPT, "cache_control": {"type": "ephemeral"}}]
+
+
+NO_API_KEY_ANSWER = 'Claude API key not configured. Add ANTHROPIC_API_KEY to your .env file.'
+
+
+def _user_message(question, context_text):
+    return f"""Here are relevant policies for reference:
+
+{context_text}
+
+---
+
+Question: {question}"""
+
+
+_client = None
+_async_client = None
+_client_lock = threading.Lock()
+
+
+def _client_options(http_client_class):
+    import httpx
+
+    return {
+        'api_key': config.ANTHROPIC_API_KEY,
+        'max_retries': config.ANTHROPIC_MAX_RETRIES,
+        'timeout': httpx.Timeout(config.ANTHROPIC_TIMEOUT, connect=config.ANTHROPIC_CONNECT_TIMEOUT),
+        'http_client': http_client_class(limits=httpx.Limits(
+            max_connections=config.ANTHROPIC_MAX_CONNECTIONS,
+            max_keepalive_connections=config.ANTHROPIC_MAX_CONNECTIONS,
+            keepalive_expiry=config.ANTHROPIC_KEEPALIVE_EXPIRY,
+        )),
+    }
+
+
+def get_client():
+    """Process-wide Anthropic client (rebuilt in a forked child)."""
+    import anthropic
+
+    global _client
+    with _client_lock:
+        if _client is None or _client.owner_pid != os.getpid():
+            _client = anthropic.Anthropic(**_client_options(anthropic.DefaultHttpxClient))
+            _client.owner_pid = os.getpid()
+        return _client
+
+
+def get_async_client():
+    """Process-wide AsyncAnthropic client for the ASGI event loop."""
+    import anthropic
+
+    global _async_client
+    with _client_lock:
+        if _async_client is None or _async_client.owner_pid != os.getpid():
+            _async_client = anthropic.AsyncAnthropic(**_client_options(anthropic.DefaultAsyncHttpxClient))
+            _async_client.owner_pid = os.getpid()
+        return _async_client
+
+
+def _message_params(question, context_text):
+    return {
+        'model': MODEL,
+        'max_tokens': 1024,
+        'system': SYSTEM_BLOCKS,
+        'messages': [{"role": "user", "content": _user_message(question, context_text)}],
+    }
+
+
+def _usage_dict(usage):
+    return {
+        'input_tokens': usage.input_tokens,
+        'output_tokens': usage.output_tokens,
+        'cache_read_input_tokens': usage.cache_read_input_tokens or 0,
+        'cache_creation_input_tokens': usage.cache_creation_input_tokens or 0,
+    }
+
+
+def _record_usage(usage):
+    usage = _usage_dict(usage)
+    metrics.inc('statescope_claude_tokens_total', usage['input_tokens'], kind='input')
+    metrics.inc('statescope_claude_tokens_total', usage['output_tokens'], kind='output')
+    metrics.inc('statescope_claude_tokens_total', usage['cache_read_input_tokens'], kind='cache_read')
+    metrics.inc('statescope_claude_tokens_total', usage['cache_creation_input_tokens'], kind='cache_write')
+    if usage['cache_read_input_tokens']:
+        result = 'hit'
+    elif usage['cache_creation_input_tokens']:
+        result = 'write'
+    else:
+        result = 'uncached'
+    metrics.inc('statescope_claude_prompt_cache_total', result=result)
+    return usage
+
 
 def ask_claude(question, context_text):
     """Send a question + retrieved policy context to Claude and return the answer."""
     if not config.ANTHROPIC_API_KEY:
         return {
-            'answer': 'Claude API key not configured. Add ANTHROPIC_API_KEY to your .env file.',
+            'answer': NO_API_KEY_ANSWER,
             'model': None,
         }
 
-    client = anthropic.Anthropic(api_key=config.ANTHROPIC_API_KEY)
+    with metrics.timed('claude'):
+        response = get_client().messages.create(**_message_params(question, context_text))
+    _record_usage(response.usage)
 
-    user_message = f"""Here are relevant policies for reference:
+    return {
+        'answer': response.content[0].text,
+        'model': MODEL,
+    }
 
-{context_text}
 
----
+def stream_claude(question, context_text):
+    """Stream the answer to a question.
 
-Question: {question}"""
+    Yields ('delta', text) events as tokens arrive, then a single
+    ('done', {'model': ..., 'usage': ...}) event.
+    """
+    if not config.ANTHROPIC_API_KEY:
+        yield 'delta', NO_API_KEY_ANSWER
+        yield 'done', {'model': None, 'usage': None}
+        return
 
-    response = client.messages.create(
-        model=MODEL,
-        max_tokens=1024,
-        system=SYSTEM_PROMPT,
-        messages=[{"role": "user", "content": user_message}],
-    )
+    with metrics.timed('claude'), get_client().messages.stream(**_message_params(question, context_text)) as stream:
+        for text in stream.text_stream:
+            yield 'delta', text
+        message = stream.get_final_message()
+
+    yield 'done', {
+        'model': MODEL,
+        'usage': _record_usage(message.usage),
+    }
+
+
+async def ask_claude_async(question, context_text):
+    """ask_claude() on the async client."""
+    if not config.ANTHROPIC_API_KEY:
+        return {
+            'answer': NO_API_KEY_ANSWER,
+            'model': None,
+        }
+
+    with metrics.timed('claude'):
+        response = await get_async_client().messages.create(**_message_params(question, context_text))
+    _record_usage(response.usage)
 
     return {
         'answer': response.content[0].text,
         'model': MODEL,
     }
+
+
+async def stream_claude_async(question, context_text):
+    """stream_claude() on the async client (an async generator)."""
+    if not config.ANTHROPIC_API_KEY:
+        yield 'delta', NO_API_KEY_ANSWER
+        yield 'done', {'model': None, 'usage': None}
+        return
+
+    with metrics.timed('claude'):
+        async with get_async_client().messages.stream(**_message_params(question, context_text)) as stream:
+            async for text in stream.text_stream:
+                yield 'delta', text
+            message = await stream.get_final_message()
+
+    yield 'done', {
+        'model': MODEL,
+        'usage': _record_usage(message.usage),
+    }
@@ -6,148 +6,335 @@ Auth: API key via query param ?api_key=...
 Rate limit: 5,000 requests/hour
 """
 
+import asyncio
+import random
+import re
 import time
 import httpx
 import config
+from services import response_cache
 
 BASE_URL = 'https://api.congress.gov/v3'
-REQUEST_DELAY = 0.5  # seconds between requests to be polite
+RATE_LIMIT_PER_HOUR = 5000   # documented API quota
+RATE_LIMIT_BURST = 20        # requests allowed back-to-back before throttling kicks in
+MAX_CONCURRENCY = 8          # in-flight requests (and pooled connections)
+MAX_RETRIES = 4
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+BACKOFF_BASE = 1.0           # seconds; doubled on each retry
+
+
+class TokenBucket:
+    """Async token bucket refilling `rate` tokens/second up to `capacity`."""
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+class CongressClient:
+    """Pooled async HTTP client with bounded concurrency, rate limiting and retries.
+
+    cache_mode selects the on-disk response cache behaviour (see
+    services.response_cache); it defaults to CONGRESS_CACHE_MODE.
+    """
 
+    def __init__(self, max_concurrency=MAX_CONCURRENCY, cache_mode=None):
+        self.cache_mode = cache_mode or config.CONGRESS_CACHE_MODE
+        self._http = httpx.AsyncClient(
+            base_url=BASE_URL,
+            timeout=30,
+            limits=httpx.Limits(max_connections=max_concurrency,
+                                max_keepalive_connections=max_concurrency),
+        )
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._bucket = TokenBucket(RATE_LIMIT_PER_HOUR / 3600, RATE_LIMIT_BURST)
 
-def _get(path, params=None):
-    """Make an authenticated GET request to the Congress.gov API."""
-    if not config.CONGRESS_API_KEY:
-        raise RuntimeError('CONGRESS_API_KEY not configured. Add it to your .env file.')
+    async def __aenter__(self):
+        return self
 
-    if params is None:
-        params = {}
-    params['api_key'] = config.CONGRESS_API_KEY
-    params['format'] = 'json'
+    async def __aexit__(self, *exc):
+        await self._http.aclose()
+
+    async def get(self, path, params=None):
+        return await _get(self, path, params)
 
-    resp = httpx.get(f'{BASE_URL}{path}', params=params, timeout=30)
-    resp.raise_for_status()
-    return resp.json()
 
+async def _get(api, path, params=None):
+    """Make an authenticated GET request to the Congress.gov API.
 
-def fetch_bill(congress, bill_type, number):
+    Responses are served from / written to the on-disk cache according to
+    api.cache_mode. Retries transport errors, 429s and 5xx responses with
+    exponential backoff (honouring Retry-After when the API sends one).
+    """
+    params = dict(params or {})
+    params['format'] = 'json'
+
+    cached = response_cache.load(path, params, api.cache_mode)
+    if cached is not None:
+        return cached
+
+    if not config.CONGRESS_API_KEY:
+        raise RuntimeError('CONGRESS_API_KEY not configured. Add it to your .env file.')
+    request_params = {**params, 'api_key': config.CONGRESS_API_KEY}
+
+    for attempt in range(MAX_RETRIES + 1):
+        retry_after = None
+        await api._bucket.acquire()
+        async with api._semaphore:
+            try:
+                resp = await api._http.get(path, params=request_params)
+            except httpx.TransportError:
+                if attempt == MAX_RETRIES:
+                    raise
+            else:
+                if resp.status_code not in RETRY_STATUSES or attempt == MAX_RETRIES:
+                    resp.raise_for_status()
+                    data = resp.json()
+                    response_cache.store(path, params, data, api.cache_mode)
+                    return data
+                retry_after = resp.headers.get('Retry-After')
+
+        if retry_after and retry_after.isdigit():
+            delay = float(retry_after)
+        else:
+            delay = BACKOFF_BASE * 2 ** attempt + random.uniform(0, BACKOFF_BASE)
+        await asyncio.sleep(delay)
+
+
+async def fetch_bill(api, congress, bill_type, number):
     """Fetch a single bill's details.
 
     Args:
+        api: CongressClient
         congress: Congress number (e.g. 118)
         bill_type: 'hr', 's', 'hjres', 'sjres'
         number: Bill number (e.g. 6834)
 
     Returns:
-        dict with bill data, or None on error
+        dict with bill data. Raises once retries are exhausted or if the
+        response has no bill.
+    """
+    data = await api.get(f'/bill/{congress}/{bill_type}/{number}')
+    bill = data.get('bill')
+    if not bill:
+        raise ValueError('response has no bill')
+    return bill
+
+
+async def fetch_bill_summaries(api, congress, bill_type, number):
+    """Fetch the most recent summary for a bill ('' if it has none).
+
+    Raises on request failure, so an outage is never mistaken for a bill
+    without a summary.
     """
+    data = await api.get(f'/bill/{congress}/{bill_type}/{number}/summaries')
+    summaries = data.get('summaries', [])
+    if summaries:
+        # Return the most recent summary
+        return summaries[-1].get('text', '')
+    return ''
+
+
+async def fetch_bill_subjects(api, congress, bill_type, number):
+    """Fetch subject terms for a bill. Raises on request failure."""
+    data = await api.get(f'/bill/{congress}/{bill_type}/{number}/subjects')
+    subjects = data.get('subjects', {})
+    terms = subjects.get('legislativeSubjects', [])
+    return [t.get('name', '') for t in terms]
+
+
+def normalize_bill(entry, bill, summary, subjects):
+    """Turn raw API responses for one bill into a dict ready for database insertion."""
+    congress = entry['congress']
+    bill_type = entry['type']
+    number = entry['number']
+
+    # Determine status
+    latest_action = bill.get('latestAction', {}).get('text', '')
+    status = _parse_status(bill, latest_action)
+
+    # Build bill number display string
+    type_prefix = {'hr': 'H.R.', 's': 'S.', 'hjres': 'H.J.Res.', 'sjres': 'S.J.Res.'}.get(bill_type, bill_type.upper())
+    bill_number_str = f'{type_prefix} {number}'
+
+    # Sponsor
+    sponsors = bill.get('sponsors', [])
+    sponsor = sponsors[0].get('fullName', '') if sponsors else None
+
+    # Dates
+    introduced = bill.get('introducedDate', None)
+    enacted_date = None
+    if status == 'enacted':
+        for action in bill.get('actions', {}).get('items', []):
+            if 'enacted' in action.get('text', '').lower() or 'became public law' in action.get('text', '').lower():
+                enacted_date = action.get('actionDate')
+                break
+
+    # Clean HTML from summary
+    if summary:
+        summary = re.sub(r'<[^>]+>', '', summary).strip()
+
+    # The API url is the API endpoint; build the public Congress.gov URL instead
+    public_url = f'https://www.congress.gov/bill/{_ordinal(congress)}-congress/{_type_slug(bill_type)}/{number}'
+
+    return {
+        'title': bill.get('title', entry.get('note', f'{bill_number_str}')),
+        'description': bill.get('title', ''),
+        'policy_type': 'bill',
+        'level': 'federal',
+        'status': status,
+        'date_introduced': introduced,
+        'date_enacted': enacted_date,
+        'bill_number': bill_number_str,
+        'sponsor': sponsor,
+        'summary_text': summary[:2000] if summary else None,
+        'source_url': public_url,
+        'congress': congress,
+        'subjects': subjects,
+    }
+
+
+def bill_key(entry):
+    """Stable identifier for a bill_numbers.json entry."""
+    return f"{entry['congress']}-{entry['type']}-{entry['number']}"
+
+
+def sync_cursor(bill):
+    """(update_date, latest_action) pair used to detect changed bills."""
+    action = bill.get('latestAction') or {}
+    latest = f"{action.get('actionDate', '')} {action.get('text', '')}".strip()
+    return bill.get('updateDate'), latest
+
+
+async def _fetch_one(api, entry):
+    """('changed', bill dict) or ('failed', bill_key) for one bill."""
+    congress = entry['congress']
+    bill_type = entry['type']
+    number = entry['number']
+    key = bill_key(entry)
+
+    print(f'Fetching {bill_type.upper()} {number} ({entry.get("note", "")})...')
     try:
-        data = _get(f'/bill/{congress}/{bill_type}/{number}')
-        return data.get('bill')
+        # The three per-bill calls are independent, so issue them together
+        bill, summary, subjects = await asyncio.gather(
+            fetch_bill(api, congress, bill_type, number),
+            fetch_bill_summaries(api, congress, bill_type, number),
+            fetch_bill_subjects(api, congress, bill_type, number),
+        )
     except Exception as e:
         print(f'  Error fetching {bill_type}{number}: {e}')
-        return None
+        return 'failed', key
+    result = normalize_bill(entry, bill, summary, subjects)
+    result['bill_key'] = key
+    result['update_date'], result['latest_action'] = sync_cursor(bill)
+    return 'changed', result
 
 
-def fetch_bill_summaries(congress, bill_type, number):
-    """Fetch summaries for a bill (may have multiple versions)."""
-    try:
-        data = _get(f'/bill/{congress}/{bill_type}/{number}/summaries')
-        summaries = data.get('summaries', [])
-        if summaries:
-            # Return the most recent summary
-            return summaries[-1].get('text', '')
-        return ''
-    except Exception:
-        return ''
-
-
-def fetch_bill_subjects(congress, bill_type, number):
-    """Fetch subject terms for a bill."""
+def _split_outcomes(results):
+    outcomes = {'changed': [], 'unchanged': [], 'failed': []}
+    for outcome, value in results:
+        outcomes[outcome].append(value)
+    return outcomes['changed'], outcomes['unchanged'], outcomes['failed']
+
+
+async def fetch_all_bills_async(bill_list, max_concurrency=MAX_CONCURRENCY, cache_mode=None):
+    """Concurrently fetch full details for a list of bills (see fetch_all_bills)."""
+    async with CongressClient(max_concurrency, cache_mode) as api:
+        results = await asyncio.gather(*(_fetch_one(api, entry) for entry in bill_list))
+    bills, _, failed = _split_outcomes(results)
+    return bills, failed
+
+
+async def _sync_one(api, entry, sync_state):
+    """('changed', bill dict), ('unchanged', bill_key) or ('failed', bill_key).
+
+    A bill only counts as changed when the bill, its summaries and its
+    subjects were all fetched; otherwise it is reported as failed, so it is
+    neither written nor has its sync cursor advanced.
+    """
+    congress = entry['congress']
+    bill_type = entry['type']
+    number = entry['number']
+    key = bill_key(entry)
+
     try:
-        data = _get(f'/bill/{congress}/{bill_type}/{number}/subjects')
-        subjects = data.get('subjects', {})
-        terms = subjects.get('legislativeSubjects', [])
-        return [t.get('name', '') for t in terms]
-    except Exception:
-        return []
+        bill = await fetch_bill(api, congress, bill_type, number)
+        cursor = sync_cursor(bill)
+        if sync_state.get(key) == cursor:
+            return 'unchanged', key
+
+        print(f'Changed: {bill_type.upper()} {number} ({entry.get("note", "")})')
+        summary, subjects = await asyncio.gather(
+            fetch_bill_summaries(api, congress, bill_type, number),
+            fetch_bill_subjects(api, congress, bill_type, number),
+        )
+    except Exception as e:
+        print(f'  Error fetching {bill_type}{number}: {e}')
+        return 'failed', key
+    result = normalize_bill(entry, bill, summary, subjects)
+    result['bill_key'] = key
+    result['update_date'], result['latest_action'] = cursor
+    return 'changed', result
+
+
+async def sync_bills_async(bill_list, sync_state, max_concurrency=MAX_CONCURRENCY, cache_mode=None):
+    """Concurrent implementation of sync_bills."""
+    async with CongressClient(max_concurrency, cache_mode) as api:
+        results = await asyncio.gather(*(_sync_one(api, e, sync_state) for e in bill_list))
+    return _split_outcomes(results)
+
 
+def sync_bills(bill_list, sync_state, max_concurrency=MAX_CONCURRENCY, cache_mode=None):
+    """Incrementally fetch bills whose metadata changed since the last sync.
 
-def fetch_all_bills(bill_list):
+    Only the bill endpoint is called for every entry; summaries and
+    subjects are fetched just for bills whose (updateDate, latestAction)
+    differs from sync_state.
+
+    Args:
+        bill_list: List of dicts with 'congress', 'type', 'number', 'note' keys
+        sync_state: Dict of bill_key -> (update_date, latest_action) from the last sync
+        cache_mode: On-disk response cache mode (see services.response_cache)
+
+    Returns:
+        (changed, unchanged, failed): normalized dicts for changed bills
+        (with 'bill_key', 'update_date' and 'latest_action' added), the
+        keys of bills that were skipped, and the keys of bills that could
+        not be fetched completely (to be retried on the next run)
+    """
+    return asyncio.run(sync_bills_async(bill_list, sync_state, max_concurrency, cache_mode))
+
+
+def fetch_all_bills(bill_list, max_concurrency=MAX_CONCURRENCY, cache_mode=None):
     """Fetch full details for a list of bills.
 
+    Requests run concurrently over one pooled connection set, throttled by
+    a token bucket to the API's hourly quota.
+
     Args:
         bill_list: List of dicts with 'congress', 'type', 'number', 'note' keys
+        cache_mode: On-disk response cache mode (see services.response_cache)
 
     Returns:
-        List of normalized bill dicts ready for database insertion
+        (bills, failed): normalized bill dicts ready for database
+        insertion, in the same order as bill_list, and the keys of bills
+        that could not be fetched completely
     """
-    results = []
-
-    for entry in bill_list:
-        congress = entry['congress']
-        bill_type = entry['type']
-        number = entry['number']
-
-        print(f'Fetching {bill_type.upper()} {number} ({entry.get("note", "")})...')
-        bill = fetch_bill(congress, bill_type, number)
-        if not bill:
-            continue
-
-        time.sleep(REQUEST_DELAY)
-
-        # Fetch summary
-        summary = fetch_bill_summaries(congress, bill_type, number)
-        time.sleep(REQUEST_DELAY)
-
-        # Determine status
-        latest_action = bill.get('latestAction', {}).get('text', '')
-        status = _parse_status(bill, latest_action)
-
-        # Build bill number display string
-        type_prefix = {'hr': 'H.R.', 's': 'S.', 'hjres': 'H.J.Res.', 'sjres': 'S.J.Res.'}.get(bill_type, bill_type.upper())
-        bill_number_str = f'{type_prefix} {number}'
-
-        # Sponsor
-        sponsors = bill.get('sponsors', [])
-        sponsor = sponsors[0].get('fullName', '') if sponsors else None
-
-        # Dates
-        introduced = bill.get('introducedDate', None)
-        enacted_date = None
-        if status == 'enacted':
-            for action in bill.get('actions', {}).get('items', []):
-                if 'enacted' in action.get('text', '').lower() or 'became public law' in action.get('text', '').lower():
-                    enacted_date = action.get('actionDate')
-                    break
-
-        # Clean HTML from summary
-        if summary:
-            import re
-            summary = re.sub(r'<[^>]+>', '', summary).strip()
-
-        # Congress.gov URL
-        url = bill.get('url', f'https://www.congress.gov/bill/{congress}th-congress/{_type_slug(bill_type)}/{number}')
-        # The API url is the API endpoint; build the public URL instead
-        public_url = f'https://www.congress.gov/bill/{_ordinal(congress)}-congress/{_type_slug(bill_type)}/{number}'
-
-        results.append({
-            'title': bill.get('title', entry.get('note', f'{bill_number_str}')),
-            'description': bill.get('title', ''),
-            'policy_type': 'bill',
-            'level': 'federal',
-            'status': status,
-            'date_introduced': introduced,
-            'date_enacted': enacted_date,
-            'bill_number': bill_number_str,
-            'sponsor': sponsor,
-            'summary_text': summary[:2000] if summary else None,
-            'source_url': public_url,
-            'congress': congress,
-            'subjects': fetch_bill_subjects(congress, bill_type, number),
-        })
-        time.sleep(REQUEST_DELAY)
-
-    return results
+    return asyncio.run(fetch_all_bills_async(bill_list, max_concurrency, cache_mode))
 
 
 def _parse_status(bill, latest_action):
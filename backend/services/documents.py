@@ -0,0 +1,166 @@
+"""Text extraction and chunking for guidance documents (HTML and PDF).
+
+Everything here is plain functions over a file path, so extraction can run
+in worker processes. Sources are read incrementally: HTML is fed to an
+HTMLParser in READ_SIZE pieces, PDFs are read one page at a time, and
+remote files are streamed to a temporary file rather than held in memory.
+PDF support needs the optional pypdf package.
+"""
+
+import os
+import re
+import tempfile
+from html.parser import HTMLParser
+
+READ_SIZE = 64 * 1024
+CHUNK_CHARS = 1200     # target passage length
+CHUNK_OVERLAP = 200    # characters repeated between neighbouring passages
+DOWNLOAD_TIMEOUT = 60
+
+_SKIP_TAGS = {'script', 'style', 'noscript', 'template', 'svg', 'head'}
+_BLOCK_TAGS = {
+    'p', 'div', 'br', 'li', 'ul', 'ol', 'tr', 'table', 'section', 'article',
+    'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'blockquote', 'pre', 'header', 'footer',
+}
+_SPACES = re.compile(r'[ \t\r\f\v]+')
+_BLANK_LINES = re.compile(r'\n\s*\n+')
+
+
+class _TextExtractor(HTMLParser):
+    """Collects visible text, turning block elements into line breaks."""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.pieces = []
+        self.title = None
+        self._skip_depth = 0
+        self._in_title = False
+
+    def handle_starttag(self, tag, attrs):
+        if tag == 'title':
+            self._in_title = True
+        elif tag in _SKIP_TAGS:
+            self._skip_depth += 1
+        elif tag in _BLOCK_TAGS:
+            self.pieces.append('\n')
+
+    def handle_endtag(self, tag):
+        if tag == 'title':
+            self._in_title = False
+        elif tag in _SKIP_TAGS and self._skip_depth:
+            self._skip_depth -= 1
+        elif tag in _BLOCK_TAGS:
+            self.pieces.append('\n')
+
+    def handle_data(self, data):
+        if self._in_title:
+            self.title = (self.title or '') + data.strip()
+        elif not self._skip_depth:
+            self.pieces.append(data)
+
+
+def normalize_text(text):
+    """Collapse runs of spaces and blank lines."""
+    text = _SPACES.sub(' ', text)
+    text = '\n'.join(line.strip() for line in text.split('\n'))
+    return _BLANK_LINES.sub('\n\n', text).strip()
+
+
+def extract_html(path):
+    """(title, text) of an HTML file, parsed in READ_SIZE pieces."""
+    parser = _TextExtractor()
+    with open(path, encoding='utf-8', errors='replace') as f:
+        while True:
+            block = f.read(READ_SIZE)
+            if not block:
+                break
+            parser.feed(block)
+    parser.close()
+    return parser.title, normalize_text(''.join(parser.pieces))
+
+
+def extract_pdf(path):
+    """(title, text) of a PDF, extracted page by page with pypdf."""
+    from pypdf import PdfReader
+
+    reader = PdfReader(path)
+    title = reader.metadata.title if reader.metadata else None
+    pages = []
+    for page in reader.pages:
+        pages.append(normalize_text(page.extract_text() or ''))
+    return title, '\n\n'.join(p for p in pages if p)
+
+
+def _is_pdf(path):
+    with open(path, 'rb') as f:
+        return f.read(5) == b'%PDF-'
+
+
+def download(url, directory):
+    """Stream url to a file in directory and return its path."""
+    import requests
+
+    fd, path = tempfile.mkstemp(dir=directory)
+    with os.fdopen(fd, 'wb') as out, requests.get(url, stream=True, timeout=DOWNLOAD_TIMEOUT, headers={
+        'User-Agent': 'Mozilla/5.0 (compatible; StateScope/1.0; education-research)',
+    }) as resp:
+        resp.raise_for_status()
+        for block in resp.iter_content(READ_SIZE):
+            out.write(block)
+    return path
+
+
+def chunk_text(text, size=CHUNK_CHARS, overlap=CHUNK_OVERLAP):
+    """Yield (start, end) offsets of overlapping passages of text.
+
+    Passages end at a paragraph, sentence or word boundary when one falls
+    in the second half of the window, and the next passage starts overlap
+    characters before the previous end (moved forward to a word start).
+    """
+    length = len(text)
+    start = 0
+    while start < length:
+        end = min(start + size, length)
+        if end < length:
+            window = text[start + size // 2:end]
+            for sep in ('\n\n', '. ', ' '):
+                cut = window.rfind(sep)
+                if cut != -1:
+                    end = start + size // 2 + cut + len(sep)
+                    break
+        yield start, end
+        if end >= length:
+            break
+        next_start = max(end - overlap, start + 1)
+        space = text.find(' ', next_start, end)
+        start = space + 1 if space != -1 else next_start
+
+
+def extract_document(source):
+    """Extract and chunk one document; runs in a worker process.
+
+    source is a dict with 'source' (local path or http(s) URL) plus any
+    metadata to pass through. Returns the source dict extended with
+    'title', 'doc_type', 'text' and 'chunks' (list of (start, end)), or
+    with 'error' if extraction failed.
+    """
+    location = source['source']
+    result = dict(source)
+    with tempfile.TemporaryDirectory() as tmp:
+        try:
+            path = download(location, tmp) if location.startswith(('http://', 'https://')) else location
+            if _is_pdf(path):
+                title, text = extract_pdf(path)
+                doc_type = 'pdf'
+            else:
+                title, text = extract_html(path)
+                doc_type = 'webpage'
+        except Exception as e:
+            result['error'] = f'{type(e).__name__}: {e}'
+            return result
+
+    result['title'] = source.get('title') or title or os.path.basename(location.rstrip('/'))
+    result['doc_type'] = source.get('doc_type') or doc_type
+    result['text'] = text
+    result['chunks'] = list(chunk_text(text))
+    return result
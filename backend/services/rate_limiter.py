@@ -0,0 +1,89 @@
+"""Per-IP token-bucket rate limiting for /api/ask, shared by all workers.
+
+Buckets live in their own SQLite file, one row per client address, so every
+gunicorn worker on the host draws from the same budget. A bucket holds up to
+RATE_LIMIT_BURST tokens and refills at RATE_LIMIT_PER_MINUTE; each request
+takes one token. A bucket idle long enough to refill completely is identical
+to a new one, so those rows are deleted and the table only holds recently
+active clients.
+"""
+
+import math
+import sqlite3
+import time
+
+import config
+from models.database import get_db
+
+_SCHEMA = '''
+CREATE TABLE IF NOT EXISTS buckets (
+    ip TEXT PRIMARY KEY,
+    tokens REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS idx_buckets_updated ON buckets(updated_at);
+'''
+
+EVICT_INTERVAL = 30  # seconds between idle-bucket sweeps per worker
+UNKNOWN_CLIENT = 'unknown'  # shared bucket for requests without a client address
+
+_initialized = set()
+_last_evict = 0.0
+
+
+def _db():
+    db = get_db(readonly=False, path=config.RATE_LIMIT_PATH)
+    if config.RATE_LIMIT_PATH not in _initialized:
+        db.executescript(_SCHEMA)
+        _initialized.add(config.RATE_LIMIT_PATH)
+    return db
+
+
+def _evict_idle(db, now, capacity, rate):
+    global _last_evict
+    if now - _last_evict < EVICT_INTERVAL:
+        return
+    _last_evict = now
+    db.execute('DELETE FROM buckets WHERE updated_at < ?', (now - capacity / rate,))
+
+
+def check_rate_limit(ip):
+    """Take one token from ip's bucket.
+
+    Returns (allowed, retry_after) where retry_after is the number of whole
+    seconds until a token is available (0 when allowed). Requests with no
+    address (ip None) all share one bucket; a NULL key would never conflict
+    in the upsert and so would never be limited.
+    """
+    ip = ip or UNKNOWN_CLIENT
+    capacity = config.RATE_LIMIT_BURST
+    rate = config.RATE_LIMIT_PER_MINUTE / 60.0
+    now = time.time()
+    try:
+        db = _db()
+        # IMMEDIATE takes the write lock up front so concurrent workers
+        # serialize on the read-modify-write instead of failing the upgrade
+        db.execute('BEGIN IMMEDIATE')
+        try:
+            row = db.execute('SELECT tokens, updated_at FROM buckets WHERE ip = ?', (ip,)).fetchone()
+            tokens = capacity if row is None else min(capacity, row['tokens'] + (now - row['updated_at']) * rate)
+            allowed = tokens >= 1
+            if allowed:
+                tokens -= 1
+            db.execute('''
+                INSERT INTO buckets (ip, tokens, updated_at) VALUES (?, ?, ?)
+                ON CONFLICT(ip) DO UPDATE SET tokens = excluded.tokens, updated_at = excluded.updated_at
+            ''', (ip, tokens, now))
+            _evict_idle(db, now, capacity, rate)
+            db.commit()
+        except BaseException:
+            db.rollback()
+            raise
+    except sqlite3.OperationalError:
+        # Limiter storage unavailable (locked past busy_timeout, read-only
+        # disk): fail open rather than take /api/ask down with it
+        return True, 0
+    if allowed:
+        return True, 0
+    return False, max(1, math.ceil((1 - tokens) / rate))
@@ -0,0 +1,95 @@
+"""Content-addressed on-disk cache for Congress.gov API responses.
+
+Entries are gzipped JSON files named after a hash of the request path and
+params (the API key is never part of the key), so cached runs are
+reproducible and safe to share. Modes:
+
+    off      always hit the network (default)
+    on       serve entries younger than the endpoint's TTL, refetch the rest
+    replay   serve any cached entry regardless of age, fetch only on a miss
+    offline  serve any cached entry, never touch the network (misses raise CacheMiss)
+"""
+
+import gzip
+import hashlib
+import json
+import os
+import tempfile
+import time
+
+import config
+
+MODES = ('off', 'on', 'replay', 'offline')
+
+# Seconds a cached response stays fresh in 'on' mode, by endpoint kind
+TTLS = {
+    'bill': 6 * 3600,
+    'summaries': 7 * 24 * 3600,
+    'subjects': 7 * 24 * 3600,
+}
+
+EXCLUDED_PARAMS = {'api_key'}
+
+
+class CacheMiss(LookupError):
+    """Raised in offline mode when a response is not cached."""
+
+
+def endpoint_kind(path):
+    last = path.rstrip('/').rsplit('/', 1)[-1]
+    return last if last in TTLS else 'bill'
+
+
+def cache_key(path, params):
+    """Hash of the request path and params, excluding credentials."""
+    clean = sorted((k, str(v)) for k, v in (params or {}).items() if k not in EXCLUDED_PARAMS)
+    return hashlib.sha256(json.dumps([path, clean]).encode()).hexdigest()
+
+
+def _entry_path(key):
+    return os.path.join(config.CONGRESS_CACHE_DIR, key[:2], f'{key}.json.gz')
+
+
+def load(path, params, mode):
+    """Return the cached response body for this request, or None.
+
+    Raises CacheMiss in offline mode when nothing is cached.
+    """
+    if mode == 'off':
+        return None
+    entry_path = _entry_path(cache_key(path, params))
+    try:
+        with gzip.open(entry_path, 'rt', encoding='utf-8') as f:
+            entry = json.load(f)
+    except (OSError, ValueError):
+        entry = None
+
+    if entry is not None:
+        fresh = time.time() - entry['fetched_at'] < TTLS[endpoint_kind(path)]
+        if fresh or mode in ('replay', 'offline'):
+            return entry['data']
+    if mode == 'offline':
+        raise CacheMiss(f'No cached response for {path}')
+    return None
+
+
+def store(path, params, data, mode):
+    """Write a response body to the cache (atomically) unless mode is 'off'."""
+    if mode == 'off':
+        return
+    entry_path = _entry_path(cache_key(path, params))
+    os.makedirs(os.path.dirname(entry_path), exist_ok=True)
+    entry = {
+        'path': path,
+        'params': {k: v for k, v in (params or {}).items() if k not in EXCLUDED_PARAMS},
+        'fetched_at': time.time(),
+        'data': data,
+    }
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(entry_path), suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as raw, gzip.open(raw, 'wt', encoding='utf-8') as f:
+            json.dump(entry, f)
+        os.replace(tmp_path, entry_path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
@@ -1,92 +1,200 @@
 """Retrieve relevant policies from the database to build Claude prompt context."""
 
+import re
+
+import config
 from models.database import get_db
+from models.materialized import estimate_tokens, render_snippet, truncate_to_tokens
+from models.queries import FTS_WEIGHTS, STOP_WORDS, fts_match_expression, fts_terms
+from services import vector_index
+
+MIN_TRUNCATED_TOKENS = 60   # don't squeeze in a policy with less room than this
+DUPLICATE_SIMILARITY = 0.8  # word-set Jaccard above which two snippets are the same policy
+DUPLICATE_MIN_WORDS = 20    # summaries shorter than this are never judged near-duplicates
+CANDIDATE_FACTOR = 3        # keyword / vector candidates fetched per result before fusion
+RRF_K = 60                  # reciprocal rank fusion damping constant
+
+
+_POLICY_COLUMNS = '''
+    p.*, s.name as state_name, s.code as state_code, ps.snippet, ps.token_estimate
+'''
+_POLICY_JOINS = '''
+    LEFT JOIN states s ON p.state_id = s.id
+    LEFT JOIN policy_snippets ps ON ps.policy_id = p.id
+'''
+
+
+def _fuse(rankings, k=RRF_K):
+    """Reciprocal rank fusion of several best-first id lists."""
+    scores = {}
+    for ranking in rankings:
+        for rank, policy_id in enumerate(ranking):
+            scores[policy_id] = scores.get(policy_id, 0.0) + 1.0 / (k + rank + 1)
+    return sorted(scores.items(), key=lambda item: item[1], reverse=True)
 
 
 def retrieve_context(question, limit=10):
-    """Search policies by keyword matching against the question.
-    Returns a list of policy dicts with state info attached."""
+    """Find the policies most relevant to the question.
+
+    Keyword matches ranked by BM25 (title weighted double) are fused with
+    nearest neighbours from the vector index by reciprocal rank, so
+    paraphrased questions still find the right policies. Results come back
+    as policy dicts with state info attached.
+    """
     db = get_db()
 
     # Extract meaningful words (skip short/common words)
-    stop = {'the', 'a', 'an', 'is', 'are', 'was', 'were', 'do', 'does', 'did',
-            'has', 'have', 'had', 'what', 'which', 'who', 'how', 'when', 'where',
-            'why', 'can', 'will', 'would', 'should', 'could', 'about', 'with',
-            'from', 'for', 'and', 'but', 'or', 'not', 'this', 'that', 'any',
-            'all', 'each', 'been', 'being', 'their', 'there', 'they', 'them',
-            'than', 'into', 'some', 'such', 'its', 'also', 'most', 'more'}
-    words = [w for w in question.lower().split() if len(w) > 2 and w.strip('?.,!') not in stop]
+    words = [w for w in fts_terms(question) if len(w) > 2 and w not in STOP_WORDS]
 
     if not words:
         # Fallback: return most recent policies
-        rows = db.execute('''
-            SELECT p.*, s.name as state_name, s.code as state_code
+        rows = db.execute(f'''
+            SELECT {_POLICY_COLUMNS}
             FROM policies p
-            LEFT JOIN states s ON p.state_id = s.id
+            {_POLICY_JOINS}
             ORDER BY p.date_introduced DESC
             LIMIT ?
         ''', (limit,)).fetchall()
         db.close()
         return [dict(r) for r in rows]
 
-    # Build OR conditions for each keyword across title, description, summary
-    conditions = []
-    params = []
-    for w in words:
-        pattern = f'%{w}%'
-        conditions.append('(p.title LIKE ? OR p.description LIKE ? OR p.summary_text LIKE ?)')
-        params.extend([pattern, pattern, pattern])
-
-    where = ' OR '.join(conditions)
-    params.append(limit)
-
-    # Build parameterized relevance scoring
-    relevance_parts = []
-    relevance_params = []
-    for w in words:
-        pattern = f'%{w}%'
-        relevance_parts.append(
-            "(CASE WHEN p.title LIKE ? THEN 2 ELSE 0 END) + "
-            "(CASE WHEN p.description LIKE ? THEN 1 ELSE 0 END) + "
-            "(CASE WHEN p.summary_text LIKE ? THEN 1 ELSE 0 END)"
-        )
-        relevance_params.extend([pattern, pattern, pattern])
-
-    relevance_expr = ' + '.join(relevance_parts)
-    all_params = relevance_params + params
-
+    candidates = limit * CANDIDATE_FACTOR
+    # bm25() is lower-is-better, so negate it to keep "higher relevance first"
     rows = db.execute(f'''
-        SELECT p.*, s.name as state_name, s.code as state_code,
-               ({relevance_expr}) as relevance
-        FROM policies p
-        LEFT JOIN states s ON p.state_id = s.id
-        WHERE {where}
+        SELECT {_POLICY_COLUMNS},
+               -bm25(policies_fts, ?, ?, ?) as relevance
+        FROM policies_fts
+        JOIN policies p ON p.id = policies_fts.rowid
+        {_POLICY_JOINS}
+        WHERE policies_fts MATCH ?
         ORDER BY relevance DESC, p.date_introduced DESC
         LIMIT ?
-    ''', all_params).fetchall()
+    ''', (*FTS_WEIGHTS, fts_match_expression(words), candidates)).fetchall()
+    keyword = {r['id']: dict(r) for r in rows}
+
+    semantic = vector_index.search(question, candidates)
+    if not semantic:
+        db.close()
+        return list(keyword.values())[:limit]
+
+    fused = _fuse([list(keyword), semantic])[:limit]
+    missing = [policy_id for policy_id, _ in fused if policy_id not in keyword]
+    if missing:
+        rows = db.execute(f'''
+            SELECT {_POLICY_COLUMNS}
+            FROM policies p
+            {_POLICY_JOINS}
+            WHERE p.id IN ({','.join('?' * len(missing))})
+        ''', missing).fetchall()
+        keyword.update((r['id'], dict(r)) for r in rows)
+    db.close()
+
+    results = []
+    for policy_id, score in fused:
+        policy = keyword.get(policy_id)
+        if policy is not None:  # vector index may be a build behind a deletion
+            policy['relevance'] = score
+            results.append(policy)
+    return results
+
+
+def retrieve_passages(question, limit=5, state_code=None):
+    """Best-matching document passages (chunks) for the question, by BM25.
+
+    Each result carries its chunk text, character offsets into the parent
+    document's extracted_text, and the document's title, URL and state.
+    """
+    words = [w for w in fts_terms(question) if len(w) > 2 and w not in STOP_WORDS]
+    if not words:
+        return []
+
+    conditions = ['document_chunks_fts MATCH ?']
+    params = [fts_match_expression(words)]
+    if state_code:
+        conditions.append('s.code = ?')
+        params.append(state_code.upper())
+
+    db = get_db()
+    rows = db.execute(f'''
+        SELECT c.id as chunk_id, c.document_id, c.chunk_index, c.start_offset, c.end_offset, c.text,
+               d.title as document_title, d.doc_type, d.source_url, d.policy_id,
+               s.name as state_name, s.code as state_code,
+               -bm25(document_chunks_fts) as relevance
+        FROM document_chunks_fts
+        JOIN document_chunks c ON c.id = document_chunks_fts.rowid
+        JOIN documents d ON d.id = c.document_id
+        LEFT JOIN states s ON d.state_id = s.id
+        WHERE {' AND '.join(conditions)}
+        ORDER BY relevance DESC
+        LIMIT ?
+    ''', (*params, limit)).fetchall()
     db.close()
     return [dict(r) for r in rows]
 
 
-def format_context(policies):
-    """Format retrieved policies into a text block for the Claude prompt."""
+def _words(text):
+    return set(re.findall(r'[a-z0-9]+', text.lower()))
+
+
+def _duplicate_words(snippet):
+    """Title and summary words of a snippet, or None if its summary is too short to compare.
+
+    The Location/Type/Status lines are left out: they are shared boilerplate
+    that would make distinct summary-less policies look identical.
+    """
+    title, _, rest = snippet.partition('\n')
+    summary = _words(rest.partition('Summary: ')[2])
+    if len(summary) < DUPLICATE_MIN_WORDS:
+        return None
+    return summary | _words(title)
+
+
+def _is_near_duplicate(words, kept):
+    for other in kept:
+        union = len(words | other)
+        if union and len(words & other) / union >= DUPLICATE_SIMILARITY:
+            return True
+    return False
+
+
+def build_context(policies, budget=None):
+    """Pack retrieved policies into a prompt context of at most budget tokens.
+
+    Policies are taken in relevance order using their precomputed snippets;
+    near-duplicates of an already packed policy are dropped, and the first
+    policy that doesn't fit is truncated into the remaining room. Returns
+    (context_text, packed_policies): citation [n] refers to packed_policies[n-1].
+    """
     if not policies:
-        return "No specific policies matched this query."
+        return "No specific policies matched this query.", []
 
+    budget = budget or config.CONTEXT_TOKEN_BUDGET
     parts = []
-    for i, p in enumerate(policies, 1):
-        location = p.get('state_name') or 'Federal'
-        lines = [
-            f"[{i}] {p['title']}",
-            f"    Location: {location}",
-            f"    Type: {p['policy_type']} | Status: {p['status']}",
-        ]
-        if p.get('date_introduced'):
-            lines.append(f"    Introduced: {p['date_introduced']}")
-        if p.get('bill_number'):
-            lines.append(f"    Bill: {p['bill_number']}")
-        if p.get('summary_text'):
-            lines.append(f"    Summary: {p['summary_text']}")
-        parts.append('\n'.join(lines))
-
-    return '\n\n'.join(parts)
+    packed = []
+    kept_words = []
+    remaining = budget
+    for p in policies:
+        snippet = p.get('snippet') or render_snippet(
+            p['title'], p.get('state_name'), p['policy_type'], p['status'],
+            p.get('date_introduced'), p.get('bill_number'), p.get('summary_text'))
+        words = _duplicate_words(snippet)
+        if words is not None and _is_near_duplicate(words, kept_words):
+            continue
+
+        entry = f"[{len(packed) + 1}] {snippet}"
+        cost = p.get('token_estimate') or estimate_tokens(snippet)
+        cost += 2  # citation marker and separator
+        if cost > remaining:
+            if remaining < MIN_TRUNCATED_TOKENS:
+                break
+            entry = truncate_to_tokens(entry, remaining - 2)
+            cost = remaining
+        parts.append(entry)
+        packed.append(p)
+        if words is not None:
+            kept_words.append(words)
+        remaining -= cost
+        if remaining < MIN_TRUNCATED_TOKENS:
+            break
+
+    return '\n\n'.join(parts), packed
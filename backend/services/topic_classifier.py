@@ -0,0 +1,111 @@
+"""Keyword topic classifier shared by every ingestion path.
+
+TOPIC_KEYWORDS is compiled once into a trie over words: text is split into
+lowercase word tokens in a single regex pass and each token starts (at
+most) a short walk down the trie, so matching is linear in the text no
+matter how many keywords there are. Keywords therefore always match whole
+words; phrases ("task force") match across any whitespace or punctuation
+("task-force"), and a trailing * makes the last word a prefix match
+("curricul*" matches curriculum and curricula). Overlapping keywords
+("student data governance") all count.
+
+Policies that arrive without curated topics are tagged with classify();
+those links are stored with policy_topics.source = 'classifier' and can be
+recomputed in bulk by scripts/reclassify_topics.py after editing
+TOPIC_KEYWORDS.
+"""
+
+import re
+
+TOPIC_KEYWORDS = {
+    'AI Literacy': ['literacy', 'literate'],
+    'Student Privacy': ['privacy', 'student data', 'ferpa', 'personally identifiable'],
+    'Teacher Training': ['teacher*', 'educator*', 'professional development', 'training'],
+    'Curriculum': ['curricul*', 'standards', 'course', 'courses', 'coursework'],
+    'Assessment': ['assessment*', 'testing', 'evaluation*'],
+    'Procurement': ['procurement', 'vendor*', 'purchasing'],
+    'Task Forces': ['task force*', 'commission', 'committee*', 'study', 'studies', 'advisory', 'working group*'],
+    'Academic Integrity': ['integrity', 'cheating', 'plagiarism'],
+    'Equity & Access': ['equity', 'equitable', 'access', 'accessibility', 'underserved', 'disadvantaged',
+                        'digital divide'],
+    'Data Governance': ['data governance', 'data management', 'transparency'],
+    'Workforce Development': ['workforce', 'career*', 'job', 'jobs', 'employment'],
+    'Research': ['research*', 'study', 'studies', 'grant', 'grants', 'fund', 'funds', 'funding'],
+}
+
+# Assigned when nothing matches, so every classified policy has a topic
+FALLBACK_TOPIC = 'Research'
+
+
+_WORD = re.compile(r'\w+')
+
+
+class _Node:
+    __slots__ = ('children', 'prefixes', 'topics')
+
+    def __init__(self):
+        self.children = {}   # next word -> node
+        self.prefixes = {}   # first letter -> [(prefix, topics)] for trailing-* keywords
+        self.topics = set()  # topics of the keyword ending here
+
+
+def compile_keywords(topic_keywords):
+    """Compile a {topic: [keyword, ...]} map into a word trie."""
+    root = _Node()
+    for topic, keywords in topic_keywords.items():
+        for keyword in keywords:
+            words = _WORD.findall(keyword.lower())
+            node = root
+            for word in words[:-1]:
+                node = node.children.setdefault(word, _Node())
+            if keyword.endswith('*'):
+                entries = node.prefixes.setdefault(words[-1][0], [])
+                for prefix, topics in entries:
+                    if prefix == words[-1]:
+                        topics.add(topic)
+                        break
+                else:
+                    entries.append((words[-1], {topic}))
+            else:
+                node.children.setdefault(words[-1], _Node()).topics.add(topic)
+    return root
+
+
+_ROOT = compile_keywords(TOPIC_KEYWORDS)
+_TOPIC_ORDER = {topic: i for i, topic in enumerate(TOPIC_KEYWORDS)}
+
+
+def _match(root, words, found):
+    n = len(words)
+    for i in range(n):
+        node = root
+        j = i
+        while j < n:
+            word = words[j]
+            for prefix, topics in node.prefixes.get(word[0], ()):
+                if word.startswith(prefix):
+                    found |= topics
+            node = node.children.get(word)
+            if node is None:
+                break
+            found |= node.topics
+            j += 1
+
+
+def classify(*texts, fallback=FALLBACK_TOPIC):
+    """Topic names matched anywhere in texts, in TOPIC_KEYWORDS order.
+
+    Returns [fallback] when nothing matches (pass fallback=None for []).
+    """
+    found = set()
+    for text in texts:
+        if text:
+            _match(_ROOT, _WORD.findall(text.lower()), found)
+    if not found:
+        return [fallback] if fallback else []
+    return sorted(found, key=_TOPIC_ORDER.__getitem__)
+
+
+def classify_policy(title, description=None, summary_text=None, subjects=()):
+    """classify() over the policy fields every ingestion path has."""
+    return classify(title, description, summary_text, ' | '.join(subjects or ()))
@@ -0,0 +1,246 @@
+"""Local semantic index of policies for retrieval.
+
+Each policy is embedded offline as a hashed TF-IDF vector: stemmed words
+and word bigrams from the title, description and summary, plus a few
+domain concept tokens so paraphrases like "chatbots in classrooms" and
+"generative AI in schools" overlap. Features are signed-hashed into DIM
+dimensions and L2-normalized, so cosine similarity is a dot product. No
+model download or network access is needed.
+
+The index is a directory of .npy files (vectors, policy ids, IDF table)
+under VECTOR_INDEX_DIR/<build>/, with a CURRENT file naming the live
+build. Workers open the arrays with mmap_mode='r', so loading takes
+milliseconds and every worker shares the same page cache. A rebuild only
+re-embeds policies whose text changed since the previous build.
+
+numpy is imported lazily; without it (or without a built index) search()
+returns no results and retrieval falls back to keyword matching alone.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import threading
+import time
+import zlib
+from collections import Counter
+from functools import lru_cache
+
+import config
+from models.queries import STOP_WORDS, fts_terms
+
+DIM = 512                  # embedding width; 100k policies ~ 200 MB mapped
+IDF_SPACE = 1 << 20        # hashed vocabulary size for document frequencies
+TITLE_WEIGHT = 2.0         # mirrors the title weight used for BM25
+FULL_REBUILD_RATIO = 0.2   # re-derive IDF once this share of rows changed since the last full build
+
+# Domain paraphrases mapped onto a shared concept token
+CONCEPTS = {
+    'chatbot': 'genai', 'chatgpt': 'genai', 'generative': 'genai', 'llm': 'genai',
+    'gpt': 'genai', 'copilot': 'genai',
+    'ai': 'artificial_intelligence', 'artificial': 'artificial_intelligence',
+    'school': 'k12', 'classroom': 'k12', 'k12': 'k12', 'student': 'k12', 'teacher': 'k12',
+    'district': 'k12', 'pupil': 'k12',
+    'university': 'higher_ed', 'college': 'higher_ed', 'postsecondary': 'higher_ed',
+    'privacy': 'data_protection', 'ferpa': 'data_protection', 'surveillance': 'data_protection',
+    'cheating': 'integrity', 'plagiarism': 'integrity', 'integrity': 'integrity',
+    'literacy': 'ai_literacy', 'curriculum': 'instruction', 'instruction': 'instruction',
+    'training': 'professional_development', 'commission': 'task_force', 'council': 'task_force',
+}
+
+_lock = threading.Lock()
+_loaded = None  # (build name, vectors, ids, idf)
+
+
+@lru_cache(maxsize=1 << 16)
+def _stem(word):
+    if len(word) > 4 and word.endswith('ies'):
+        return word[:-3] + 'y'
+    if len(word) > 3 and word.endswith('s') and not word.endswith('ss'):
+        return word[:-1]
+    return word
+
+
+def features(text):
+    """Unigram, bigram and concept features of text."""
+    words = [_stem(w) for w in fts_terms(text.replace('-', '')) if w not in STOP_WORDS]
+    words = [w for w in words if len(w) > 1]
+    feats = list(words)
+    feats.extend(f'{a} {b}' for a, b in zip(words, words[1:]))
+    feats.extend(f'#{CONCEPTS[w]}' for w in words if w in CONCEPTS)
+    return feats
+
+
+@lru_cache(maxsize=1 << 18)
+def _hash(feature):
+    return zlib.crc32(feature.encode())
+
+
+def _hashed_features(np, counts):
+    """(feature hashes, term frequencies) arrays for a feature Counter."""
+    hashes = np.fromiter((_hash(f) for f in counts), dtype=np.int64, count=len(counts))
+    tf = np.fromiter(counts.values(), dtype=np.float32, count=len(counts))
+    return hashes, tf
+
+
+def _document(np, title, body):
+    counts = Counter()
+    for f in features(title or ''):
+        counts[f] += TITLE_WEIGHT
+    for f in features(body or ''):
+        counts[f] += 1
+    return _hashed_features(np, counts)
+
+
+def _embed(np, hashes, tf, idf):
+    signs = np.where(hashes >> 20 & 1, 1.0, -1.0)
+    weights = signs * (1 + np.log(tf)) * idf[hashes % IDF_SPACE]
+    vec = np.bincount(hashes % DIM, weights=weights, minlength=DIM).astype(np.float32)
+    norm = np.linalg.norm(vec)
+    return vec / norm if norm else vec
+
+
+def _content_hash(title, body):
+    return hashlib.sha1(f'{title}\0{body}'.encode()).hexdigest()
+
+
+def _policy_rows(db):
+    for row in db.execute('SELECT id, title, description, summary_text FROM policies ORDER BY id'):
+        yield row[0], row[1], f'{row[2] or ""} {row[3] or ""}'
+
+
+def _current_build(index_dir):
+    try:
+        with open(os.path.join(index_dir, 'CURRENT')) as f:
+            return f.read().strip() or None
+    except FileNotFoundError:
+        return None
+
+
+def build(db, index_dir=None, full=False):
+    """Bring the index in index_dir up to date with the policies in db.
+
+    Reuses the vectors of policies whose text is unchanged since the last
+    build. IDF weights are recomputed (and everything re-embedded) on a
+    full build, which happens on request, on the first build, or once
+    enough of the corpus has changed. Returns a stats dict.
+    """
+    import numpy as np
+
+    index_dir = index_dir or config.VECTOR_INDEX_DIR
+    os.makedirs(index_dir, exist_ok=True)
+    previous = _current_build(index_dir)
+    meta = {}
+    if previous:
+        with open(os.path.join(index_dir, previous, 'meta.json')) as f:
+            meta = json.load(f)
+
+    rows = list(_policy_rows(db))
+    hashes = {str(pid): _content_hash(title, body) for pid, title, body in rows}
+    old_hashes = meta.get('hashes', {})
+    changed = [pid for pid, _, _ in rows if old_hashes.get(str(pid)) != hashes[str(pid)]]
+    removed = len(set(old_hashes) - set(hashes))
+    drift = meta.get('changed_since_full', 0) + len(changed) + removed
+    full = full or not previous or drift > FULL_REBUILD_RATIO * max(meta.get('full_build_size', 0), 1)
+
+    if not full and not changed and not removed:
+        return {'build': previous, 'policies': len(rows), 'embedded': 0, 'full': False}
+
+    changed_ids = set(changed)
+    if full:
+        docs = {pid: _document(np, title, body) for pid, title, body in rows}
+        df = np.bincount(np.concatenate([h % IDF_SPACE for h, _ in docs.values()] or [np.zeros(0, np.int64)]),
+                         minlength=IDF_SPACE)
+        idf = (np.log((1 + len(rows)) / (1 + df)) + 1).astype(np.float32)
+        old_vectors, old_rows = None, {}
+    else:
+        docs = {pid: _document(np, title, body) for pid, title, body in rows if pid in changed_ids}
+        old_dir = os.path.join(index_dir, previous)
+        idf = np.load(os.path.join(old_dir, 'idf.npy'))
+        old_vectors = np.load(os.path.join(old_dir, 'vectors.npy'), mmap_mode='r')
+        old_rows = {int(pid): i for i, pid in enumerate(np.load(os.path.join(old_dir, 'ids.npy')))}
+
+    name = f'build-{time.strftime("%Y%m%d%H%M%S")}-{os.getpid()}'
+    build_dir = os.path.join(index_dir, name)
+    os.makedirs(build_dir)
+    vectors = np.lib.format.open_memmap(os.path.join(build_dir, 'vectors.npy'), mode='w+',
+                                        dtype=np.float32, shape=(len(rows), DIM))
+    embedded = 0
+    for i, (pid, title, body) in enumerate(rows):
+        if pid in docs:
+            vectors[i] = _embed(np, *docs[pid], idf)
+            embedded += 1
+        else:
+            vectors[i] = old_vectors[old_rows[pid]]
+    vectors.flush()
+    del vectors
+    np.save(os.path.join(build_dir, 'ids.npy'), np.array([pid for pid, _, _ in rows], dtype=np.int64))
+    np.save(os.path.join(build_dir, 'idf.npy'), idf)
+    with open(os.path.join(build_dir, 'meta.json'), 'w') as f:
+        json.dump({
+            'dim': DIM,
+            'built_at': int(time.time()),
+            'full_build_size': len(rows) if full else meta['full_build_size'],
+            'changed_since_full': 0 if full else drift,
+            'hashes': hashes,
+        }, f)
+
+    # Swap the pointer atomically; workers still mapping the old build keep
+    # their (now unlinked) files until they reload
+    tmp_path = os.path.join(index_dir, 'CURRENT.tmp')
+    with open(tmp_path, 'w') as f:
+        f.write(name)
+    os.replace(tmp_path, os.path.join(index_dir, 'CURRENT'))
+    for entry in os.listdir(index_dir):
+        if entry.startswith('build-') and entry != name:
+            shutil.rmtree(os.path.join(index_dir, entry), ignore_errors=True)
+    return {'build': name, 'policies': len(rows), 'embedded': embedded, 'full': full}
+
+
+def _load():
+    """Map the current build, reloading when CURRENT points somewhere new."""
+    global _loaded
+    try:
+        import numpy as np
+    except ImportError:
+        return None
+    index_dir = config.VECTOR_INDEX_DIR
+    name = _current_build(index_dir)
+    if name is None:
+        return None
+    with _lock:
+        if _loaded is None or _loaded[0] != name:
+            build_dir = os.path.join(index_dir, name)
+            try:
+                _loaded = (
+                    name,
+                    np.load(os.path.join(build_dir, 'vectors.npy'), mmap_mode='r'),
+                    np.load(os.path.join(build_dir, 'ids.npy'), mmap_mode='r'),
+                    np.load(os.path.join(build_dir, 'idf.npy'), mmap_mode='r'),
+                )
+            except FileNotFoundError:
+                return None  # replaced mid-load; the next call picks up the new build
+        return _loaded
+
+
+def search(question, limit=10):
+    """Top policy ids by cosine similarity to question, best first.
+
+    Returns [] when numpy or the index is unavailable.
+    """
+    loaded = _load()
+    if loaded is None:
+        return []
+    import numpy as np
+
+    _, vectors, ids, idf = loaded
+    counts = Counter(features(question))
+    if not counts or not len(ids):
+        return []
+    query = _embed(np, *_hashed_features(np, counts), idf)
+    scores = vectors @ query
+    k = min(limit, len(scores))
+    top = np.argpartition(-scores, k - 1)[:k]
+    top = top[np.argsort(-scores[top])]
+    return [int(ids[i]) for i in top if scores[i] > 0]
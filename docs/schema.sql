@@ -35,6 +35,7 @@ CREATE TABLE IF NOT EXISTS topics (
 CREATE TABLE IF NOT EXISTS policy_topics (
     policy_id INTEGER NOT NULL,
     topic_id INTEGER NOT NULL,
+    source TEXT NOT NULL DEFAULT 'curated',  -- 'curated' (from the data) or 'classifier' (services/topic_classifier.py)
     PRIMARY KEY (policy_id, topic_id),
     FOREIGN KEY (policy_id) REFERENCES policies(id),
     FOREIGN KEY (topic_id) REFERENCES topics(id)
@@ -53,10 +54,162 @@ CREATE TABLE IF NOT EXISTS documents (
     FOREIGN KEY (policy_id) REFERENCES policies(id)
 );
 
+-- Overlapping passages of documents.extracted_text written by
+-- scripts/ingest_documents.py; offsets are character positions in that text
+CREATE TABLE IF NOT EXISTS document_chunks (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    document_id INTEGER NOT NULL,
+    chunk_index INTEGER NOT NULL,
+    start_offset INTEGER NOT NULL,
+    end_offset INTEGER NOT NULL,
+    text TEXT NOT NULL,
+    UNIQUE (document_id, chunk_index),
+    FOREIGN KEY (document_id) REFERENCES documents(id)
+);
+
+-- Per-state rollup served by /api/states; rebuilt by the ingestion scripts
+-- through models.materialized.refresh_materialized()
+CREATE TABLE IF NOT EXISTS state_summary (
+    state_id INTEGER PRIMARY KEY,
+    policy_count INTEGER NOT NULL DEFAULT 0,
+    policy_status TEXT NOT NULL DEFAULT 'none',  -- 'enacted', 'pending', 'guidance', 'failed', 'none'
+    FOREIGN KEY (state_id) REFERENCES states(id)
+);
+
+-- Policy counts by year x state x topic x policy_type x status x level for the
+-- Trends tab, rebuilt by refresh_materialized(). Rows with topic_id = 0 count
+-- every policy once; rows with topic_id > 0 count policies linked to that topic.
+CREATE TABLE IF NOT EXISTS trends_cube (
+    year TEXT,                       -- strftime('%Y', date_introduced), NULL if undated
+    state_id INTEGER,                -- NULL for federal
+    topic_id INTEGER NOT NULL,       -- 0 = all policies
+    policy_type TEXT NOT NULL,
+    status TEXT NOT NULL,
+    level TEXT NOT NULL,
+    count INTEGER NOT NULL
+);
+
+-- Small rollups of trends_cube behind /api/trends/topics, /status and /level;
+-- scanning the full cube for a 1-D breakdown costs more than the base tables
+CREATE TABLE IF NOT EXISTS trends_topic_counts (
+    topic_id INTEGER NOT NULL,
+    state_id INTEGER,                -- NULL for federal
+    policy_type TEXT NOT NULL,
+    count INTEGER NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS trends_breakdown (
+    dimension TEXT NOT NULL,         -- 'status' or 'level'
+    value TEXT NOT NULL,
+    count INTEGER NOT NULL,
+    PRIMARY KEY (dimension, value)
+);
+
+-- The /api/trends/cube response, JSON-encoded once per refresh
+CREATE TABLE IF NOT EXISTS trends_cube_encoded (
+    id INTEGER PRIMARY KEY CHECK (id = 1),
+    body TEXT NOT NULL
+);
+
+-- Pre-rendered Q&A context entry per policy (header lines plus a summary cut
+-- to a sentence boundary) with its approximate token count, so /api/ask can
+-- pack a token budget without re-rendering; rebuilt by refresh_materialized().
+CREATE TABLE IF NOT EXISTS policy_snippets (
+    policy_id INTEGER PRIMARY KEY,
+    snippet TEXT NOT NULL,
+    token_estimate INTEGER NOT NULL,
+    FOREIGN KEY (policy_id) REFERENCES policies(id)
+);
+
+-- Single-row data version; bumped by refresh_materialized() on every ingest.
+-- Read endpoints derive their ETag / Last-Modified headers from it.
+CREATE TABLE IF NOT EXISTS data_version (
+    id INTEGER PRIMARY KEY CHECK (id = 1),
+    version INTEGER NOT NULL,
+    updated_at INTEGER NOT NULL      -- unix timestamp of the last bump
+);
+
+INSERT OR IGNORE INTO data_version (id, version, updated_at) VALUES (1, 1, CAST(strftime('%s', 'now') AS INTEGER));
+
+-- Per-bill cursor for incremental Congress.gov syncs (scripts/fetch_congress.py)
+CREATE TABLE IF NOT EXISTS congress_sync (
+    bill_key TEXT PRIMARY KEY,       -- '<congress>-<type>-<number>', e.g. '118-hr-6834'
+    policy_id INTEGER NOT NULL,
+    update_date TEXT,                -- bill.updateDate reported by the API
+    latest_action TEXT,              -- '<actionDate> <text>' of bill.latestAction
+    subjects TEXT,                   -- JSON array of legislative subjects, reused by reclassify
+    synced_at TEXT NOT NULL,
+    FOREIGN KEY (policy_id) REFERENCES policies(id)
+);
+
 -- Indexes
+CREATE INDEX IF NOT EXISTS idx_states_name ON states(name);
+CREATE INDEX IF NOT EXISTS idx_trends_cube_topic ON trends_cube(topic_id, state_id, policy_type);
+CREATE INDEX IF NOT EXISTS idx_trends_topic_counts ON trends_topic_counts(topic_id, state_id, policy_type);
 CREATE INDEX IF NOT EXISTS idx_policies_state_id ON policies(state_id);
 CREATE INDEX IF NOT EXISTS idx_policies_level ON policies(level);
 CREATE INDEX IF NOT EXISTS idx_policies_status ON policies(status);
 CREATE INDEX IF NOT EXISTS idx_policies_date ON policies(date_introduced);
+-- Keyset pagination for /api/policies (ORDER BY date_introduced DESC, id DESC)
+CREATE INDEX IF NOT EXISTS idx_policies_date_id ON policies(date_introduced, id);
+CREATE INDEX IF NOT EXISTS idx_policies_level_status_date ON policies(level, status, date_introduced, id);
+CREATE INDEX IF NOT EXISTS idx_policies_level_date ON policies(level, date_introduced, id);
+CREATE INDEX IF NOT EXISTS idx_policies_status_date ON policies(status, date_introduced, id);
+CREATE INDEX IF NOT EXISTS idx_policy_topics_topic ON policy_topics(topic_id, policy_id);
+-- Natural keys used by models.ingest upserts (federal policies have state_id NULL)
+CREATE UNIQUE INDEX IF NOT EXISTS idx_policies_bill_key
+    ON policies(COALESCE(state_id, 0), bill_number) WHERE bill_number IS NOT NULL;
+CREATE UNIQUE INDEX IF NOT EXISTS idx_policies_title_key
+    ON policies(COALESCE(state_id, 0), title) WHERE bill_number IS NULL;
 CREATE INDEX IF NOT EXISTS idx_documents_state_id ON documents(state_id);
 CREATE INDEX IF NOT EXISTS idx_documents_policy_id ON documents(policy_id);
+CREATE INDEX IF NOT EXISTS idx_documents_source_url ON documents(source_url);
+
+-- Full-text index over policies (external content, kept in sync by triggers).
+-- Queried with bm25(policies_fts, 2.0, 1.0, 1.0) so title matches weigh double.
+CREATE VIRTUAL TABLE IF NOT EXISTS policies_fts USING fts5(
+    title,
+    description,
+    summary_text,
+    content='policies',
+    content_rowid='id',
+    tokenize='porter unicode61'
+);
+
+CREATE TRIGGER IF NOT EXISTS policies_fts_insert AFTER INSERT ON policies BEGIN
+    INSERT INTO policies_fts (rowid, title, description, summary_text)
+    VALUES (new.id, new.title, new.description, new.summary_text);
+END;
+
+CREATE TRIGGER IF NOT EXISTS policies_fts_delete AFTER DELETE ON policies BEGIN
+    INSERT INTO policies_fts (policies_fts, rowid, title, description, summary_text)
+    VALUES ('delete', old.id, old.title, old.description, old.summary_text);
+END;
+
+CREATE TRIGGER IF NOT EXISTS policies_fts_update AFTER UPDATE OF title, description, summary_text ON policies BEGIN
+    INSERT INTO policies_fts (policies_fts, rowid, title, description, summary_text)
+    VALUES ('delete', old.id, old.title, old.description, old.summary_text);
+    INSERT INTO policies_fts (rowid, title, description, summary_text)
+    VALUES (new.id, new.title, new.description, new.summary_text);
+END;
+
+-- Passage-level full-text index over document_chunks (external content).
+CREATE VIRTUAL TABLE IF NOT EXISTS document_chunks_fts USING fts5(
+    text,
+    content='document_chunks',
+    content_rowid='id',
+    tokenize='porter unicode61'
+);
+
+CREATE TRIGGER IF NOT EXISTS document_chunks_fts_insert AFTER INSERT ON document_chunks BEGIN
+    INSERT INTO document_chunks_fts (rowid, text) VALUES (new.id, new.text);
+END;
+
+CREATE TRIGGER IF NOT EXISTS document_chunks_fts_delete AFTER DELETE ON document_chunks BEGIN
+    INSERT INTO document_chunks_fts (document_chunks_fts, rowid, text) VALUES ('delete', old.id, old.text);
+END;
+
+CREATE TRIGGER IF NOT EXISTS document_chunks_fts_update AFTER UPDATE OF text ON document_chunks BEGIN
+    INSERT INTO document_chunks_fts (document_chunks_fts, rowid, text) VALUES ('delete', old.id, old.text);
+    INSERT INTO document_chunks_fts (rowid, text) VALUES (new.id, new.text);
+END;